@@ -61,6 +61,8 @@
           scene=CreateConcavePolygon
           mkdir -p assets/font
           cp ${convexityFont}/NewRocker-Regular.ttf assets/font
+          # one process per section, joined in order without re-encoding
+          export SOME_RENDER_JOBS=$NIX_BUILD_CORES
           manim render main.py $scene
           mv media/videos/main/1080p60/$scene.mp4 $out
         '';
@@ -1,12 +1,14 @@
+import inspect
 import math
-import random
-from copy import deepcopy
-from dataclasses import dataclass
-from functools import total_ordering
-from typing import Sequence, Union, overload
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
 
 import manim  # type: ignore
 import manim.utils.color as colors  # type: ignore
+import numpy as np
 from manim import (
     PI,
     Angle,
@@ -35,204 +37,50 @@ from manim import (
     VGroup,
     VMobject,
     Write,
+    config,
     register_font,
 )
+from manim.renderer.cairo_renderer import CairoRenderer  # type: ignore
+from manim.scene.scene_file_writer import SceneFileWriter  # type: ignore
+from manim.utils.file_ops import (  # type: ignore
+    is_gif_format,
+    open_media_file,
+    write_to_movie,
+)
 
-
-@dataclass
-@total_ordering
-class Point(Sequence[float]):
-    x: float
-    y: float
-    z: float
-
-    def distanceFrom(self, p) -> float:
-        return math.sqrt(
-            (self.x - p.x) ** 2 + (self.y - p.y) ** 2 + (self.z - p.z) ** 2
-        )
-
-    @overload
-    def __getitem__(self, i: int) -> float:
-        pass
-
-    @overload
-    def __getitem__(self, i: slice) -> Sequence[float]:
-        pass
-
-    def __getitem__(self, i: Union[int, slice]) -> Union[float, Sequence[float]]:
-        return [self.x, self.y, self.z][i]
-
-    def __len__(self) -> int:
-        return 3
-
-    def __setitem__(self, i: int, v: float) -> None:
-        if i == 0:
-            self.x = v
-        elif i == 1:
-            self.y = v
-        elif i == 2:
-            self.z = v
-        else:
-            raise KeyError()
-
-    def __lt__(self, other: "Point") -> bool:
-        return [self.x, self.y, self.z] < [other.x, other.y, other.z]
-
+from some.cache import FlipCache
+from some.convexify import flipBatches
+from some.geometry import (
+    Point,
+    PointArray,
+    Points,
+    convexity_tolerance,
+    findMidPoint,
+    midpointChordProjection,
+)
+from some.plan import RenderPlan, SectionPlan, buildRenderPlan
+from some.render import SectionCache, concatMovies, renderJobs
+from some.timeline import Frame, Shape, Timeline
+from some.timing import instrument, timer
 
 fill_color = colors.BLUE_D
 stroke_color = colors.BLUE_E
 hull_color = colors.PURE_RED
 highlight_color = colors.RED
 
-# For two points `a` and `b`, return True if the entire polygon is on one side
-# of the AB line. Otherwise, return False.
-def convexCheck(a: Point, b: Point, points: list[Point]) -> bool:
-
-    check = 0  # -1 => on left side, 0 => on the line, 1 => on the right side
-    if a.x == b.x:
-
-        for p in points:
-
-            if p.x < a.x:
-
-                if check == 1:
-                    return False
-                else:
-                    check = -1
-
-            elif p.x > a.x:
-
-                if check == -1:
-                    return False
-                else:
-                    check = 1
-
-        return True
-
-    else:
-        c = Point(a.x - b.x, a.y - b.y, a.z - b.z)
-        for p in points:
-            d = Point(p.x - b.x, p.y - b.y, p.z - b.z)
-            if c.x * d.y - c.y * d.x < 0:  # cross product
-                if check == 1:
-                    return False
-                else:
-                    check = -1
-
-            elif c.x * d.y - c.y * d.x > 0:
-                if check == -1:
-                    return False
-                else:
-                    check = 1
-        return True
-
-
-# Flips between a and b points, sets the coordinates in the points list
-def flip(a: Point, b: Point, points: list[Point]) -> None:
-    i = points.index(a) + 1
-
-    if a.x == b.x:
-        while i % len(points) != points.index(b):
-
-            d = points[i % len(points)].x - b.x  # distance
-            points[i % len(points)].x += 2 * d
-
-            i += 1
-    else:
-        m = (b.y - a.y) / (b.x - a.x)  # slope
-        c = (b.x * a.y - a.x * b.y) / (b.x - a.x)  # intercept
-
-        while i % len(points) != points.index(b):
-
-            d = (points[i % len(points)].x + (points[i % len(points)].y - c) * m) / (
-                1 + m * m
-            )  # distance
-
-            points[i % len(points)].x = 2 * d - points[i % len(points)].x
-            points[i % len(points)].y = 2 * d * m - points[i % len(points)].y + 2 * c
-
-            i += 1
-
-
-# Project points in `points` between the indices a and b on the line defined by the point a and b
-def projectPointsOnLine(a: int, b: int, points: list[Point]) -> list[Point]:
-    c = b
-    if a > b:
-        c = b + len(points)
-    result = []
-    v1 = Point(
-        points[b].x - points[a].x,
-        points[b].y - points[a].y,
-        points[b].z - points[a].z,
-    )
-    v1Length = math.sqrt(v1.x**2 + v1.y**2 + v1.z**2)
-    prev_lengthfactor = 0.0
-    for p in (points * 2)[a + 1 : c]:
-        v2 = Point(p.x - points[a].x, p.y - points[a].y, p.z - points[a].z)
-        dotProduct = v1.x * v2.x + v1.y * v2.y + v1.z * v2.z
-        lengthfactor = dotProduct / (v1Length**2)
-        if lengthfactor < prev_lengthfactor:
-            lengthfactor = prev_lengthfactor
-        elif lengthfactor > 1:
-            lengthfactor = 1
-        prev_lengthfactor = lengthfactor
-        projectedP = [x * lengthfactor + y for x, y in zip(v1, points[a])]
-        result.append(Point(*projectedP))
-    return result
-
-
-def rotateList(l: list[Point], first_index: int) -> list[Point]:
-    return l[first_index:] + l[:first_index]
-
-
-# Returns the points of the convex hull of the polygon defined by the given list
-def getHullPoints(points: list[Point]) -> list[Point]:
-
-    hull_points = []
-    first = min(points)
-    first_index = points.index(first)
-    hull_points.append(points[first_index])
-    last = first_index
-    i = first_index + 1
-
-    while i != first_index:
-        if convexCheck(points[last], points[i], points):
-            hull_points += projectPointsOnLine(last, i, points)
-            hull_points.append(points[i])
-            last = i
-        i = (i + 1) % len(points)
-    hull_points += projectPointsOnLine(last, first_index, points)
-    hull_points = rotateList(hull_points, len(points) - first_index)
-    return hull_points
-
-
-# Calculates camera scale from the polygon's size
-def getCameraWidth(points: list[Point]) -> float:
-
-    multiplier = 2  # <- modify this to change scale
-
-    return (max(points).x - min(points).x) * multiplier
-
-
-# Finds a flip and executes it, and returns whether the polygon is concave after the flip
-def findFlip(points: list[Point]) -> bool:
-    c = 2
-    i = 0
-    while c <= len(points) / 2:
-        while i <= len(points) - 1:
-            if convexCheck(points[i], points[(i + c) % len(points)], points):
-                flip(points[i], points[(i + c) % len(points)], points)
-
-                return True
-            i += 1
-        c += 1
-        i = 0
-    print("It's convex!")
-    return False
-
+# With SOME_PROFILE set (see some.timing), time mobject construction, text,
+# LaTeX and every frame along with the sections and the geometry
+instrument(Polygon, "__init__", "Polygon")
+instrument(ArcPolygon, "make_smooth")
+instrument(DashedLine, "__init__", "DashedLine")
+instrument(Text, "__init__", "Text")
+instrument(manim.MathTex, "__init__", "MathTex")
+instrument(CairoRenderer, "play", "play")
+instrument(CairoRenderer, "update_frame", "rasterize")
+instrument(SceneFileWriter, "write_frame", "encode")
 
 # Generates dashed lines between the given points, returns the lines in a VGroup
-def generateDashedLines(points: list[Point]) -> VGroup:
+def generateDashedLines(points: Points) -> VGroup:
 
     storage = []
 
@@ -242,14 +90,282 @@ def generateDashedLines(points: list[Point]) -> VGroup:
     return VGroup(*storage)
 
 
-# Finds the midpoint of the line segment defind by a and b points
-def findMidPoint(a: Point, b: Point) -> Point:
-    return Point(*((c + d) / 2 for c, d in zip(a, b)))
+# Renders a single section of the scene, in a process forked from the one
+# rendering the whole scene. The sections before it are fast-forwarded (played
+# with skipped animations) to rebuild the mobjects and camera it starts from,
+# and its movie goes to the section cache.
+def renderSection(name: str) -> None:
+    config.preview = False
+    config.output_file = f"{CreateConcavePolygon.__name__}-{name}"
+    config.partial_movie_dir = (
+        f"{{video_dir}}/partial_movie_files/{{scene_name}}/{name}"
+    )
+    CreateConcavePolygon(only=name).render()
+
+
+# Returns which of `steps` equally long steps the animation is in at `alpha`
+# and how far along that step it is, eased with `rate_func`
+def flipStep(alpha: float, steps: int, rate_func) -> tuple[int, float]:  # type: ignore
+    position = alpha * steps
+    k = min(int(position), steps - 1)
+    return k, rate_func(position - k)
+
+
+# Morphs a polygon through a sequence of flip states, a (flips, n, 3) array of
+# corners, in one animation. Every flip takes `step_time` seconds and eases
+# with `step_rate_func`, like a Transform per flip would, but the mobject's
+# points are rewritten in place on every frame instead of building a mobject
+# and playing an animation per state. The mobject may start with fewer corners
+# (like a hull); its curves are subdivided to n once, when the morph begins.
+class FlipMorph(manim.Animation):  # type: ignore
+    THIRDS = np.linspace(0, 1, 4)[None, :, None]  # anchors and handles of a line
+
+    def __init__(
+        self,
+        mobject: VMobject,
+        states: np.ndarray,
+        step_time: float = 1.0,
+        step_rate_func=manim.rate_functions.smooth,  # type: ignore
+        **kwargs,  # type: ignore
+    ) -> None:
+        self.states = np.asarray(states, dtype=np.float64)
+        self.step_rate_func = step_rate_func
+        kwargs.setdefault("run_time", step_time * max(1, len(self.states)))
+        super().__init__(mobject, rate_func=manim.rate_functions.linear, **kwargs)
+
+    def begin(self) -> None:
+        if len(self.states) > 0:
+            first = self.states[0]
+            self.mobject.align_points(
+                VMobject().set_points_as_corners([*first, first[0]])
+            )
+            start = self.mobject.get_start_anchors()[None]
+            self.corners = np.concatenate((start, self.states))
+        super().begin()
+
+    def interpolate_mobject(self, alpha: float) -> None:
+        if len(self.states) == 0:
+            return
+        k, t = flipStep(alpha, len(self.states), self.step_rate_func)
+        before, after = self.corners[k], self.corners[k + 1]
+        corners = before + (after - before) * t
+        edges = np.roll(corners, -1, axis=0) - corners
+        points = self.mobject.points.reshape(-1, 4, 3)
+        points[:] = corners[:, None] + edges[:, None] * self.THIRDS
+
+
+# Moves the camera frame along a (flips, 3) path of [x, y, width] frames (see
+# some.camera) in step with a FlipMorph of the same flips
+class CameraPath(manim.Animation):  # type: ignore
+    def __init__(
+        self,
+        frame: VMobject,
+        path: np.ndarray,
+        step_time: float = 1.0,
+        step_rate_func=manim.rate_functions.smooth,  # type: ignore
+        **kwargs,  # type: ignore
+    ) -> None:
+        self.path = np.asarray(path, dtype=np.float64)
+        self.step_rate_func = step_rate_func
+        kwargs.setdefault("run_time", step_time * max(1, len(self.path)))
+        super().__init__(frame, rate_func=manim.rate_functions.linear, **kwargs)
+
+    def begin(self) -> None:
+        x, y, _ = self.mobject.get_center()
+        start = [x, y, self.mobject.width]
+        self.frames = np.concatenate(([start], self.path))
+        super().begin()
+
+    def interpolate_mobject(self, alpha: float) -> None:
+        if len(self.path) == 0:
+            return
+        k, t = flipStep(alpha, len(self.path), self.step_rate_func)
+        x, y, width = self.frames[k] + (self.frames[k + 1] - self.frames[k]) * t
+        self.mobject.move_to([x, y, 0.0]).set(width=width)
+
+
+# The part of a FlipMorph or CameraPath through `flips` flips that plays flip k
+def flipOf(animation: manim.Animation, k: int, flips: int) -> manim.Animation:
+    run_time = animation.run_time / flips
+    rate_func = animation.step_rate_func
+    if isinstance(animation, FlipMorph):
+        states = animation.states[k : k + 1]
+        return FlipMorph(
+            animation.mobject, states, step_rate_func=rate_func, run_time=run_time
+        )
+    path = animation.path[k : k + 1]
+    return CameraPath(
+        animation.mobject, path, step_rate_func=rate_func, run_time=run_time
+    )
 
 
-# Main class, contains all animations
+# Main class, contains all animations. Every section of the video is its own
+# method, drawing the geometry of its part of the render plan. Sections whose
+# content hash is unchanged since an earlier render are not rendered again;
+# their movie is taken from the section cache. The others are rendered on a
+# pool of processes (see renderJobs), then all section movies are joined.
 class CreateConcavePolygon(MovingCameraScene):  # type: ignore
+    def __init__(self, *args, only: Optional[str] = None, **kwargs):  # type: ignore
+        self.only = only  # render just this section
+        self.plan: Optional[RenderPlan] = None  # built by the first setup
+        super().__init__(*args, **kwargs)
+
+    def sections(self) -> dict:
+        return {
+            "title": self.title,
+            "frank": self.frank,
+            "flip_demo": self.flipDemo,
+            "convexify": self.convexify,
+            "perimeter": self.perimeter,
+            "distance": self.distance,
+            "limit": self.limit,
+            "tolerance": self.tolerance,
+            "eduard": self.eduard,
+            "proof": self.proof,
+        }
+
+    # The code the sections render with besides their own methods, by name
+    def renderHelpers(self) -> dict[str, str]:
+        return {
+            "generateDashedLines": inspect.getsource(generateDashedLines),
+            "flipStep": inspect.getsource(flipStep),
+            "FlipMorph": inspect.getsource(FlipMorph),
+            "CameraPath": inspect.getsource(CameraPath),
+            "moveCamera": inspect.getsource(self.moveCamera),
+            "flipBatches": inspect.getsource(self.flipBatches)
+            + inspect.getsource(flipBatches),
+            "convexity_tolerance": inspect.getsource(convexity_tolerance),
+            "findMidPoint": inspect.getsource(findMidPoint),
+            "midpointChordProjection": inspect.getsource(midpointChordProjection),
+        }
+
+    # The content hash of every section: its part of the plan, its code and the
+    # helpers it uses (see renderHelpers) and the output settings, chained to
+    # the hash of the section before it (see RenderPlan.hashes)
+    def sectionKeys(self, plan: RenderPlan) -> dict[str, str]:
+        settings = repr(
+            (
+                config.pixel_width,
+                config.pixel_height,
+                config.frame_rate,
+                config.movie_file_extension,
+                str(config.background_color),
+                [str(fill_color), str(stroke_color), str(hull_color)],
+                str(highlight_color),
+            )
+        )
+        helpers = self.renderHelpers()
+        salts = {}
+        for name, method in self.sections().items():
+            source = inspect.getsource(method)
+            # The helpers it names, and the ones they name in turn
+            used: set[str] = set()
+            pending = set(re.findall(r"\w+", source)) & helpers.keys()
+            while pending:
+                helper = pending.pop()
+                used.add(helper)
+                pending |= set(re.findall(r"\w+", helpers[helper])) & helpers.keys()
+                pending -= used
+            salts[name] = (
+                source + "".join(helpers[helper] for helper in sorted(used)) + settings
+            )
+        return plan.hashes(salts)
+
+    # Builds the plan and finds the cached sections. renderInParallel already
+    # calls it before render does, so the plan is only built once.
+    def setup(self) -> None:
+        if self.plan is None:
+            flip_cache = FlipCache(Path(config.media_dir) / "flip_cache")
+            with timer("setup"):
+                self.plan = buildRenderPlan(flip_cache)
+        self.section_keys: dict[str, str] = {}
+        self.cached_sections: set[str] = set()
+        if write_to_movie() and not is_gif_format() and not config.dry_run:
+            self.section_cache = SectionCache(
+                Path(config.media_dir) / "section_cache", config.movie_file_extension
+            )
+            self.section_keys = self.sectionKeys(self.plan)
+            if not config.disable_caching:
+                self.cached_sections = {
+                    name
+                    for name, key in self.section_keys.items()
+                    if self.section_cache.get(key) is not None
+                }
+            if self.only is not None:
+                self.cached_sections = set(self.section_keys) - {self.only}
+
     def construct(self) -> None:
+        sections = self.sections()
+        for section in self.plan.sections:
+            self.next_section(
+                section.name, skip_animations=section.name in self.cached_sections
+            )
+            with timer(f"section {section.name}"):
+                sections[section.name](section)
+            if section.name == self.only:
+                break
+
+    # Stores the sections rendered this time in the cache (before manim gets to
+    # clean up its partial movie files)
+    def tear_down(self) -> None:
+        for section in self.renderer.file_writer.sections:
+            movies = section.get_clean_partial_movie_files()
+            if section.name in self.section_keys and len(movies) > 0:
+                self.section_cache.put(
+                    self.section_keys[section.name], movies, config.ffmpeg_executable
+                )
+
+    # Renders the sections that aren't cached each in its own process, unless
+    # there is just one of them or one job. Returns whether it did.
+    def renderInParallel(self) -> bool:
+        jobs = renderJobs()
+        self.setup()
+        pending = [
+            name for name in self.section_keys if name not in self.cached_sections
+        ]
+        if jobs < 2 or len(pending) < 2:
+            return False
+        with ProcessPoolExecutor(
+            min(jobs, len(pending)), mp_context=multiprocessing.get_context("fork")
+        ) as pool:
+            for future in [pool.submit(renderSection, name) for name in pending]:
+                future.result()
+        return True
+
+    # Renders the changed sections, then joins all section movies into the
+    # scene's movie
+    def render(self, preview: bool = False) -> None:
+        show = preview or config["preview"]
+        config["preview"] = False
+        try:
+            if self.only is not None or not self.renderInParallel():
+                super().render()
+        finally:
+            config["preview"] = show
+        if self.only is None and len(self.section_keys) > 0:
+            concatMovies(
+                [self.section_cache.path(key) for key in self.section_keys.values()],
+                self.renderer.file_writer.movie_file_path,
+                config.ffmpeg_executable,
+            )
+        if show:
+            open_media_file(self.renderer.file_writer)
+
+    # The flips worth a step of their own with the camera at `widths`, one
+    # frame width per state: the ones that move a vertex by two pixels or more
+    # there, see flipBatches
+    def flipBatches(
+        self, states: np.ndarray, start: Points, widths: np.ndarray
+    ) -> np.ndarray:
+        pixels_per_unit = config.pixel_width / np.asarray(widths)
+        return flipBatches(states, PointArray(start).coords, pixels_per_unit)
+
+    # Animates the camera to one of the section's camera frames
+    def moveCamera(self, section: SectionPlan, name: str):  # type: ignore
+        x, y, width = section.cameras[name]
+        return self.camera.frame.animate.move_to([x, y, 0.0]).set(width=width)
+
+    def title(self, section: SectionPlan) -> None:
         # --- Title ---
         with register_font("./assets/font/NewRocker-Regular.ttf"):
             title1 = Text("Convexification:", font="New Rocker", font_size=90)
@@ -265,18 +381,10 @@ class CreateConcavePolygon(MovingCameraScene):  # type: ignore
         self.play(Write(title1, run_time=1), Write(title2, run_time=1))
         self.wait(2)
         self.play(Unwrite(title1, run_time=0.8), Unwrite(title2, run_time=0.8))
+
+    def frank(self, section: SectionPlan) -> None:
         # --- Create Frank ---
-        Frank_points = [
-            Point(1, 3, 0),
-            Point(0, 2, 0),
-            Point(0, 0, 0),
-            Point(-3, 0, 0),
-            Point(-1, -1, 0),
-            Point(0, -3, 0),
-            Point(1, -1, 0),
-            Point(4, 0, 0),
-            Point(2, 1, 0),
-        ]
+        Frank_points = section.points("frank")
         concave = Polygon(*Frank_points, color=stroke_color)
         concave.set_fill(fill_color, opacity=0.75)
         concave.save_state()
@@ -284,17 +392,7 @@ class CreateConcavePolygon(MovingCameraScene):  # type: ignore
         self.wait(2)
 
         # --- Dragging Frank's points to make him convex (Cheating) ---
-        convex_frank = [
-            Point(1, 3, 0),
-            Point(0, 3, 0),
-            Point(-2, 1.5, 0),
-            Point(-3, 0, 0),
-            Point(-2.5, -2, 0),
-            Point(0, -3, 0),
-            Point(3.5, -3, 0),
-            Point(4, 0, 0),
-            Point(3, 2.5, 0),
-        ]
+        convex_frank = section.points("convex_frank")
         text0 = Text("Simple polygon:", color=colors.BLUE)
         text1 = Text("has no holes")
         text2 = Text("AND")
@@ -311,13 +409,18 @@ class CreateConcavePolygon(MovingCameraScene):  # type: ignore
         self.play(Transform(concave, wrong_convex))  # Frank -> Deformed Frank
         self.wait(3)
         self.play(Restore(concave))  # Deformed Frank -> Frank
+        self.concave = concave
+
+    def flipDemo(self, section: SectionPlan) -> None:
+        concave = self.concave
+        Frank_points = section.points("frank")
 
         # --- Demonstrate flip ---
-        self.play(self.camera.frame.animate.move_to([2.5, 1.5, 0.0]).set(width=10))
+        self.play(self.moveCamera(section, "flip"))
         axis = Line(Frank_points[0], Frank_points[7], color=colors.RED)
         self.play(Create(axis))
-        orig = deepcopy(Frank_points[8])
-        flip(Frank_points[7], Frank_points[0], Frank_points)
+        orig = Frank_points[8]
+        Frank_points = section.points("flipped")
         dashed = DashedLine(orig, Frank_points[8], color=colors.RED)
         self.play(Create(dashed))
         dot = Dot(Frank_points[8], color=colors.RED)
@@ -350,12 +453,12 @@ class CreateConcavePolygon(MovingCameraScene):  # type: ignore
         )
         self.remove(dot)
         self.play(Uncreate(axis2))
-        self.play(self.camera.frame.animate.move_to([0, 0, 0.0]).set(width=128 / 9))
+        self.play(self.moveCamera(section, "center"))
 
         # --- Flip Frank, killing him ---
         axis = Line(Frank_points[0], Frank_points[4], color=colors.RED)
         self.play(Create(axis))
-        flip(Frank_points[0], Frank_points[4], Frank_points)  # Flip randonly
+        Frank_points = section.points("killed")  # Flip randonly
 
         self_intersect = Polygon(
             *Frank_points, color=stroke_color
@@ -373,32 +476,18 @@ class CreateConcavePolygon(MovingCameraScene):  # type: ignore
         self.play(FadeOut(dashed))  # Fade out dashed outline
         self.wait(1)
 
+    def convexify(self, section: SectionPlan) -> None:
         # --- Create Frank2 ---
-        Frank_2_points = [  # Define the points for Frank 2
-            Point(0, 4, 0),
-            Point(-1, 0, 0),
-            Point(-1, 2, 0),
-            Point(-2, 3, 0),
-            Point(-3, 1, 0),
-            Point(-1, -1, 0),
-            Point(-5, -1, 0),
-            Point(-3, -2, 0),
-            Point(2, 0, 0),
-            Point(0, 1, 0),
-        ]
+        Frank_2_points = section.points("frank_2")  # The points for Frank 2
         concave = Polygon(*Frank_2_points, color=stroke_color)  # Create Frank 2
         concave.set_fill(fill_color, opacity=0.75)
         concave.save_state()
         copy_of_frank_2 = Polygon(*Frank_2_points, color=highlight_color)
-        self.play(
-            self.camera.frame.animate.move_to(concave).set(
-                width=getCameraWidth(Frank_2_points)
-            )
-        )
+        self.play(self.moveCamera(section, "frank_2"))
         self.play(Create(concave))  # Show Frank 2
 
         # --- Create Frank2's hull ---
-        hull_points = getHullPoints(Frank_2_points)
+        hull_points = section.points("hull")
         # rubber band animation
         band_points = []
         band_center = Point(-1, 0, 0)
@@ -419,47 +508,32 @@ class CreateConcavePolygon(MovingCameraScene):  # type: ignore
             Transform(band, hull), rate_func=manim.rate_functions.ease_out_elastic
         )
         self.wait(2)
-        self.play(self.camera.frame.animate.move_to([-3.8, 2.2, 0.0]).set(width=22))
+        self.play(self.moveCamera(section, "overview"))
         self.remove(band)
 
         # --- Automatically convexifies Frank2 ---
-        while findFlip(Frank_2_points):
-
-            # Create the polygon after the flip
-            flipped = Polygon(*Frank_2_points, color=stroke_color)
-            flipped.set_fill(fill_color, opacity=0.75)
-
-            # Recalculate the hull after the flip
-            flipped_hull = Polygon(*getHullPoints(Frank_2_points))
-            flipped_hull.set_stroke(hull_color)
-
-            self.play(
-                Transform(concave, flipped),
-                Transform(
-                    hull,
-                    flipped_hull,
-                ),
-            )
+        batches = self.flipBatches(
+            section.states["steps"],
+            Frank_2_points,
+            section.states["camera_path"][:, 2],
+        )
+        self.play(
+            FlipMorph(concave, section.states["steps"][batches]),
+            FlipMorph(hull, section.states["step_hulls"][batches]),
+            CameraPath(self.camera.frame, section.states["camera_path"][batches]),
+        )
 
         # --- Reset Frank 2 ---
-        Frank_2_points = [
-            Point(0, 4, 0),
-            Point(-1, 0, 0),
-            Point(-1, 2, 0),
-            Point(-2, 3, 0),
-            Point(-3, 1, 0),
-            Point(-1, -1, 0),
-            Point(-5, -1, 0),
-            Point(-3, -2, 0),
-            Point(2, 0, 0),
-            Point(0, 1, 0),
-        ]
         self.play(Uncreate(hull), Restore(concave))
-        self.play(
-            self.camera.frame.animate.move_to(concave).set(
-                width=getCameraWidth(Frank_2_points)
-            )
-        )
+        self.play(self.moveCamera(section, "frank_2"))
+        self.concave = concave
+        self.hull = hull
+        self.copy_of_frank_2 = copy_of_frank_2
+
+    def perimeter(self, section: SectionPlan) -> None:
+        concave = self.concave
+        copy_of_frank_2 = self.copy_of_frank_2
+        Frank_2_points = section.points("frank_2")
 
         # --- Show that perimeter is constant ---
         self.play(
@@ -472,8 +546,8 @@ class CreateConcavePolygon(MovingCameraScene):  # type: ignore
         self.wait(2)
         prev_line_1 = Line(Frank_2_points[9], Frank_2_points[0], color = colors.LIGHT_PINK)
         prev_line_2 = Line(Frank_2_points[8], Frank_2_points[9], color = colors.PURE_GREEN)
-        point_before_flip = deepcopy(Frank_2_points[9])
-        flip(Frank_2_points[8], Frank_2_points[0], Frank_2_points)
+        point_before_flip = Frank_2_points[9]
+        Frank_2_points = section.points("flipped")
         flipped = Polygon(*Frank_2_points, color=stroke_color)
         flipped.set_fill(fill_color, opacity=0.75)
         self.play(Create(prev_line_1), Create(prev_line_2))
@@ -514,8 +588,16 @@ class CreateConcavePolygon(MovingCameraScene):  # type: ignore
                 time_width=1,
             )
         )
+
+    def distance(self, section: SectionPlan) -> None:
+        concave = self.concave
+        point_before_flip = section.points("frank_2")[9]
+        Frank_2_points = section.points("flipped")
+        flipped = Polygon(*Frank_2_points, color=stroke_color)
+        flipped.set_fill(fill_color, opacity=0.75)
+
         # --- Show that distance increases ---
-        inner_point = Point(1, 0, 0)
+        inner_point = Point(*section.parameters["inner_point"])
         inner_dot = Dot(inner_point, color=colors.GREEN)
         prev_dot = Dot(point_before_flip, color=colors.RED)
         next_dot = Dot(Frank_2_points[9], color=colors.RED)
@@ -528,7 +610,7 @@ class CreateConcavePolygon(MovingCameraScene):  # type: ignore
         self.play(FadeIn(axis))
         self.play(Transform(concave, flipped))
         self.wait(2)
-        intersect_point = Point(1.56, 0.88, 0)
+        intersect_point = Point(*section.parameters["intersect_point"])
         # create the entire line as one object to make the create animation smooth
         full_line = Line(inner_point, Frank_2_points[9], color=colors.PURE_GREEN)
         other_line = Line(inner_point, point_before_flip, color=colors.LIGHT_PINK)
@@ -613,18 +695,7 @@ class CreateConcavePolygon(MovingCameraScene):  # type: ignore
         self.wait(2)
 
         # --- show vertex can't get farther than perimeter/2 ---
-        Frank_2_extended_points = [
-            Point(-3.224768843, 0.305669231, 0),
-            Point(-7.3477603878, 0.3363404141, 0),
-            Point(-9.3469458029, 0.3934164889, 0),
-            Point(-10.7600924158, 0.3384924263, 0),
-            Point(-12.4281440321, 0.059216225, 0),
-            Point(-9.6133959371, -0.2186203491, 0),
-            Point(-5.6142604062, -0.3017768587, 0),
-            Point(-3.3784287974, -0.2692650573, 0),
-            Point(2, 0, 0),
-            Point(-0.2263518348, 0.2082246565, 0),
-        ]
+        Frank_2_extended_points = section.points("extended")
         frank_2_extended = Polygon(*Frank_2_extended_points, color=stroke_color)
         frank_2_extended.set_fill(fill_color, opacity=0.75)
         segment = Line(start=inner_point, end=Frank_2_points[4], color=colors.ORANGE)
@@ -639,7 +710,7 @@ class CreateConcavePolygon(MovingCameraScene):  # type: ignore
             FadeIn(dot),
             FadeIn(inner_dot4, run_time=0.00000000000000000000001),
         )
-        self.play(self.camera.frame.animate.move_to([-4.8, 0.2, 0.0]).set(width=18))
+        self.play(self.moveCamera(section, "extended"))
         self.play(
             Transform(concave, frank_2_extended),
             Transform(dot, dot2),
@@ -663,34 +734,25 @@ class CreateConcavePolygon(MovingCameraScene):  # type: ignore
             )
         )
         self.play(Uncreate(segment), FadeOut(dot, inner_dot4))
+
+    def limit(self, section: SectionPlan) -> None:
+        concave = self.concave
+
         # --- show limit exits ---
-        Frank_2_points = [
-            Point(0, 4, 0),
-            Point(-1, 0, 0),
-            Point(-1, 2, 0),
-            Point(-2, 3, 0),
-            Point(-3, 1, 0),
-            Point(-1, -1, 0),
-            Point(-5, -1, 0),
-            Point(-3, -2, 0),
-            Point(2, 0, 0),
-            Point(0, 1, 0),
-        ]
-        Frank_2_convex_points = deepcopy(Frank_2_points)
+        Frank_2_points = section.points("frank_2")
+        Frank_2_convex_points = section.points("convex")
         frank_2 = Polygon(*Frank_2_points, color=stroke_color)
         frank_2.set_fill(fill_color, opacity=0.75)
         self.play(ReplacementTransform(concave, frank_2))
         self.wait(2)
-        while findFlip(Frank_2_convex_points):
-            something_needs = " to be here I guess"
         frank_2_convex = Polygon(*Frank_2_convex_points, color=colors.YELLOW)
         frank_2_convex_dashed = generateDashedLines(Frank_2_convex_points)
         frank_2_convex_dashed.color = colors.YELLOW
-        self.play(self.camera.frame.animate.move_to([0.8, 0.2, 0.0]).set(width=32))
-        dot_points = [Point(0, 0, 0), Point(-2, 1, 0), Point(-3, -1.5, 0)]
+        self.play(self.moveCamera(section, "overview"))
+        dot_points = [Point(*p) for p in section.parameters["dots"]]
         dots = VGroup(*[Dot(x, color=colors.GREEN) for x in dot_points])
         self.play(FadeIn(dots))
-        DELTA = 1
+        DELTA = section.parameters["delta"]
         arrows = VGroup(
             *[
                 Arrow(
@@ -804,22 +866,21 @@ class CreateConcavePolygon(MovingCameraScene):  # type: ignore
         self.wait(1)
         self.play(Create(frank_2_convex_dashed))
         self.play(Uncreate(arrows), FadeOut(dots), *[FadeOut(x) for x in approached])
-        self.play(
-            self.camera.frame.animate.move_to(frank_2).set(
-                width=getCameraWidth(Frank_2_convex_points)
-            )
-        )
+        self.play(self.moveCamera(section, "frank_2"))
         self.wait(1)
         self.play(Uncreate(frank_2), Uncreate(frank_2_convex_dashed))
 
+    def tolerance(self, section: SectionPlan) -> None:
+        epsilon = section.parameters["epsilon"]
+
         # --- convexity tolerance ---
-        self.play(self.camera.frame.animate.move_to([0, 0, 0]).set(width=128 / 9))
+        self.play(self.moveCamera(section, "center"))
         with register_font("./assets/font/NewRocker-Regular.ttf"):
             a = Text("CONVEXITY TOLERANCE", font="New Rocker", font_size=70)
         self.play(Write(a, run_time=0.8))
         self.wait(1)
         self.play(Unwrite(a, run_time=0.5))
-        dot_points = [Point(-3, 0, 0), Point(0, 1, 0), Point(3, -1, 0)]
+        dot_points = list(section.points("dots"))
         dots = VGroup(*[Dot(x) for x in dot_points])
         segments = VMobject(color=colors.BLUE_D).set_points_as_corners(list(dot_points))
         self.play(FadeIn(dots))
@@ -836,16 +897,17 @@ class CreateConcavePolygon(MovingCameraScene):  # type: ignore
         self.bring_to_back(line)
         self.play(Create(line, run_time=2))
         circle_group = manim.Group(
-            Circle(radius=0.7397954428741, arc_center=[-3, 0, 0], color=colors.GREEN_E),
-            Circle(radius=0.7397954428741, arc_center=[0, 1, 0], color=colors.GREEN_E),
-            Circle(radius=0.7397954428741, arc_center=[3, -1, 0], color=colors.GREEN_E),
+            *[
+                Circle(radius=epsilon, arc_center=p, color=colors.GREEN_E)
+                for p in dot_points
+            ]
         )
         self.play(
             *[Create(x) for x in circle_group]
         )  # Must create angel here! If you try to create it later, then it will magically appear with these circles.
-        r1 = Line([-3, 0, 0], [-3, 0.7397954428741, 0], color=colors.ORANGE)
-        r2 = Line([0, 1, 0], [0, 1.7397954428741, 0], color=colors.ORANGE)
-        r3 = Line([3, -1, 0], [3, -1 + 0.7397954428741, 0], color=colors.ORANGE)
+        r1, r2, r3 = [
+            Line(p, [p.x, p.y + epsilon, 0], color=colors.ORANGE) for p in dot_points
+        ]
         text1 = Text("r₁", color=colors.ORANGE).scale(0.5)
         text1.move_to([0.2, 1 + 0.35, 0])
         text2 = Text("r₁", color=colors.ORANGE).scale(0.5)
@@ -922,20 +984,9 @@ class CreateConcavePolygon(MovingCameraScene):  # type: ignore
             Write(degree_notation),
         )
         self.wait(2)
-        epsilon = 0.7397954428741
-        random.seed(3.141592)
-        for i in range(8):
-            wiggled_points = []
-            for p in dot_points:
-                angle = random.random() * 2 * PI
-                length = random.random()
-                wiggled_points.append(
-                    Point(
-                        p.x + epsilon * math.cos(angle) * length,
-                        p.y + epsilon * math.sin(angle) * length,
-                        0,
-                    )
-                )
+        # A few of the Monte-Carlo trials of some.wiggle
+        for wiggled_coords in section.states["wiggles"]:
+            wiggled_points = list(PointArray(wiggled_coords))
             dot_product = (wiggled_points[0].x - wiggled_points[1].x) * (
                 wiggled_points[2].x - wiggled_points[1].x
             ) + (wiggled_points[0].y - wiggled_points[1].y) * (
@@ -1073,21 +1124,13 @@ class CreateConcavePolygon(MovingCameraScene):  # type: ignore
             Unwrite(degree_notation),
             *[Uncreate(c) for c in circle_group],
         )
-        Eduard_points = [
-            # Point(1, 3, 0),
-            Point(0, 3, 0),
-            Point(-2, 1.5, 0),
-            Point(-3, 0, 0),
-            Point(-2.5, -2, 0),
-            Point(0, -3, 0),
-            Point(3.5, -3, 0),
-            Point(4, 0, 0),
-            Point(3, 2.5, 0),
-        ]
+
+    def eduard(self, section: SectionPlan) -> None:
+        Eduard_points = list(section.points("eduard"))
         Eduard = Polygon(*Eduard_points, color=stroke_color)
         self.play(Create(Eduard))
         radiuses = []
-        epsilon = 999999999.0
+        epsilon, _ = convexity_tolerance(Eduard_points)
         for i in range(len(Eduard_points)):
             m1 = findMidPoint(
                 Eduard_points[(i - 1) % len(Eduard_points)], Eduard_points[(i)]
@@ -1097,24 +1140,12 @@ class CreateConcavePolygon(MovingCameraScene):  # type: ignore
             )
             line = Line(m1, m2, color=colors.PURPLE_D)
             line.set_length(20)
-            v1 = Point(
-                m1.x - m2.x,
-                m1.y - m2.y,
-                m1.z - m2.z,
+            projectedP = midpointChordProjection(
+                Eduard_points[(i - 1) % len(Eduard_points)],
+                Eduard_points[i],
+                Eduard_points[(i + 1) % len(Eduard_points)],
             )
-            v1Length = math.sqrt(v1.x**2 + v1.y**2 + v1.z**2)
-            v2 = Point(Eduard_points[(i)].x - m2.x, Eduard_points[(i)].y - m2.y, 0)
-            dotProduct = v1.x * v2.x + v1.y * v2.y + v1.z * v2.z
-            projectedP = Point(
-                *[x * dotProduct / (v1Length**2) + y for x, y in zip(v1, m2)]
-            )
-            v3 = Point(
-                projectedP.x - Eduard_points[i].x,
-                projectedP.y - Eduard_points[i].y,
-                projectedP.z - Eduard_points[i].z,
-            )
-            v3_length = math.sqrt(v3.x**2 + v3.y**2 + v3.z**2)
-            epsilon = min(epsilon, v3_length)
+            v3_length = Eduard_points[i].distanceFrom(projectedP)
             circle_group = manim.Group(
                 Circle(
                     radius=v3_length,
@@ -1197,19 +1228,8 @@ class CreateConcavePolygon(MovingCameraScene):  # type: ignore
         self.remove(text0)
         self.play(*[ReplacementTransform(text0.copy(), c) for c in circles])
         self.wait(2)
-        random.seed(3.141592)
-        rage = range  # Oh Manim
-        for i in rage(7):
-            wiggled_points = []
-            for p in Eduard_points:
-                angle = random.random() * 2 * PI
-                wiggled_points.append(
-                    Point(
-                        p.x + epsilon * math.cos(angle),
-                        p.y + epsilon * math.sin(angle),
-                        0,
-                    )
-                )
+        for wiggled_coords in section.states["wiggles"]:
+            wiggled_points = list(PointArray(wiggled_coords))
             wiggled = Polygon(*wiggled_points, color=stroke_color)
             self.play(Transform(Eduard, wiggled, run_time=0.7))
 
@@ -1217,83 +1237,149 @@ class CreateConcavePolygon(MovingCameraScene):  # type: ignore
         self.play(*[Uncreate(c) for c in circles], Uncreate(Eduard))
         self.wait(2)
 
+    def proof(self, section: SectionPlan) -> None:
+        hull = self.hull
+        approached = section.parameters["approached"]  # where vertex 4 ends up
+
         # --- Proof ---
-        Frank_2_points = [
-            Point(0, 4, 0),
-            Point(-1, 0, 0),
-            Point(-1, 2, 0),
-            Point(-2, 3, 0),
-            Point(-3, 1, 0),
-            Point(-1, -1, 0),
-            Point(-5, -1, 0),
-            Point(-3, -2, 0),
-            Point(2, 0, 0),
-            Point(0, 1, 0),
-        ]
+        Frank_2_points = section.points("frank_2")
         frank_2 = Polygon(*Frank_2_points, color=stroke_color)
         frank_2.set_fill(fill_color, opacity=0.75)
-        self.play(
-            self.camera.frame.animate.move_to(frank_2).set(
-                width=getCameraWidth(Frank_2_points)
-            )
-        )
+        self.play(self.moveCamera(section, "frank_2"))
         self.play(Create(frank_2))
         self.wait(2)
         dot_start = Dot(Frank_2_points[4], color=colors.RED)
-        self.play(
-            self.camera.frame.animate.move_to(Frank_2_points[4]).set(width=8),
-            FadeIn(dot_start),
-        )
-        hull_points = getHullPoints(Frank_2_points)
-        dot_approached = Dot(
-            [-8.711058823529418, 3.236235294117641, 0], color=colors.GREEN
-        )
+        self.play(self.moveCamera(section, "start"), FadeIn(dot_start))
+        dot_approached = Dot(approached, color=colors.GREEN)
         self.play(Create(hull))
-        self.play(self.camera.frame.animate.move_to([-3.8, 2.2, 0.0]).set(width=22))
+        self.play(self.moveCamera(section, "overview"))
         self.wait(1)
-        arrow = Arrow(
-            Frank_2_points[4],
-            [-8.711058823529418, 3.236235294117641, 0],
-            color=colors.GOLD,
-        )
+        arrow = Arrow(Frank_2_points[4], approached, color=colors.GOLD)
         self.wait(1)
         self.play(FadeIn(dot_approached))
         self.wait(1)
         self.play(Create(arrow))
         self.wait(1)
-        c = Circle(
-            radius=0.5,
-            arc_center=[-8.711058823529418, 3.236235294117641, 0],
-            color=colors.ORANGE,
-        )
+        c = Circle(radius=0.5, arc_center=approached, color=colors.ORANGE)
         self.play(Create(c))
-        while findFlip(Frank_2_points):
-
-            # Create the polygon after the flip
-            flipped = Polygon(*Frank_2_points, color=stroke_color)
-            flipped.set_fill(fill_color, opacity=0.75)
-            dot_start_2 = Dot(Frank_2_points[4], color=colors.RED)
-            arrow2 = Arrow(
-                Frank_2_points[4],
-                [-8.711058823529418, 3.236235294117641, 0],
-                color=colors.GOLD,
-            )
-            self.play(
-                Transform(frank_2, flipped),
-                Transform(dot_start, dot_start_2),
-                Transform(arrow, arrow2),
-            )
-        self.play(self.camera.frame.animate.move_to(Frank_2_points[4]).set(width=5))
-        dot_approached_highlight = Dot(
-            [-8.711058823529418, 3.236235294117641, 0], color=colors.YELLOW_C
+
+        # The dot and the arrow follow vertex 4 while Frank 2 is flipped
+        def followDot(dot: Dot) -> None:
+            dot.move_to(frank_2.get_start_anchors()[4])
+
+        def followArrow(arrow: Arrow) -> None:
+            start, end = frank_2.get_start_anchors()[4], np.array(approached)
+            length = np.linalg.norm(end - start)
+            if length == 0:
+                return
+            buff = (end - start) / length * manim.MED_SMALL_BUFF
+            if length > 2 * manim.MED_SMALL_BUFF:  # like Arrow(start, end)
+                start, end = start + buff, end - buff
+            arrow.put_start_and_end_on(start, end)
+
+        dot_start.add_updater(followDot)
+        arrow.add_updater(followArrow)
+        batches = self.flipBatches(
+            section.states["steps"],
+            Frank_2_points,
+            section.states["camera_path"][:, 2],
+        )
+        self.play(
+            FlipMorph(frank_2, section.states["steps"][batches]),
+            CameraPath(self.camera.frame, section.states["camera_path"][batches]),
         )
+        dot_start.remove_updater(followDot)
+        arrow.remove_updater(followArrow)
+        self.play(self.moveCamera(section, "approached"))
+        dot_approached_highlight = Dot(approached, color=colors.YELLOW_C)
         self.wait(1)
         self.play(FadeIn(dot_approached_highlight))
         self.play(FadeOut(dot_approached_highlight))
         self.wait(2)
-        self.play(self.camera.frame.animate.move_to([-3.8, 2.2, 0.0]).set(width=22))
+        self.play(self.moveCamera(section, "overview"))
         self.wait(1)
         self.play(
             Uncreate(frank_2, arrow), FadeOut(dot_start, dot_approached), Uncreate(c)
         )  # For some mysterious reason c must be in a seperate Uncreate() for it to work
         self.wait(2)
+
+
+# The scene without drawing a single frame or writing a movie: every section
+# is played with skipped animations and rasterizing switched off. Each play
+# call is recorded with the camera frame and the outlines on screen after it,
+# and written to media/dry_run as a timeline and a contact sheet (see
+# some.timeline).
+class DryRunConcavePolygon(CreateConcavePolygon):  # type: ignore
+    def __init__(self, *args, **kwargs):  # type: ignore
+        config.dry_run = True
+        super().__init__(*args, **kwargs)
+
+    def setup(self) -> None:
+        super().setup()
+        self.renderer.update_frame = lambda *args, **kwargs: None
+        self.timeline = Timeline()
+        self.section_name = ""
+
+    def next_section(self, name: str = "unnamed", *args, **kwargs) -> None:  # type: ignore
+        self.section_name = name
+        super().next_section(name, skip_animations=True)
+
+    # A play of FlipMorphs and CameraPaths through the same flips is split
+    # into a play per flip, so the timeline has every flip state and camera
+    # frame in it, not only the last
+    def play(self, *args, **kwargs) -> None:  # type: ignore
+        lengths = {
+            len(a.states) if isinstance(a, FlipMorph) else len(a.path)
+            for a in args
+            if isinstance(a, (FlipMorph, CameraPath))
+        }
+        flips = lengths.pop() if len(lengths) == 1 else 0
+        if flips > 1 and all(isinstance(a, (FlipMorph, CameraPath)) for a in args):
+            for k in range(flips):
+                self.play(*[flipOf(a, k, flips) for a in args], **kwargs)
+            return
+        start = self.renderer.time
+        super().play(*args, **kwargs)
+        frame = self.camera.frame
+        x, y, _ = frame.get_center()
+        self.timeline.frames.append(
+            Frame(
+                self.section_name,
+                len(self.timeline.frames),
+                float(start),
+                float(self.renderer.time - start),
+                [type(animation).__name__ for animation in self.animations],
+                [float(x), float(y), float(frame.width), float(frame.height)],
+                self.shapes(),
+            )
+        )
+
+    # The outlines of everything on screen except the camera frame
+    def shapes(self) -> list[Shape]:
+        shapes = []
+        for mobject in self.mobjects:
+            if mobject is self.camera.frame:
+                continue
+            for part in mobject.family_members_with_points():
+                if not isinstance(part, VMobject):
+                    continue
+                corners = list(part.get_start_anchors()) + [part.get_end_anchors()[-1]]
+                shapes.append(
+                    Shape(
+                        type(part).__name__,
+                        [
+                            [round(float(p[0]), 4), round(float(p[1]), 4)]
+                            for p in corners
+                        ],
+                        bool(part.is_closed()),
+                        part.get_stroke_color().to_hex(),
+                        part.get_fill_color().to_hex(),
+                        float(part.get_stroke_opacity()),
+                        float(part.get_fill_opacity()),
+                    )
+                )
+        return shapes
+
+    def tear_down(self) -> None:
+        super().tear_down()
+        self.timeline.write(Path(config.media_dir) / "dry_run")
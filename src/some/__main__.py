@@ -0,0 +1,3 @@
+from some.cli import main
+
+main()
@@ -0,0 +1,110 @@
+# Convexifies many polygons at once on a process pool. All vertices live in one
+# shared memory buffer that the workers attach to, so only polygon ranges and
+# per-polygon stats are pickled between processes.
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Iterable, Optional
+
+import numpy as np
+
+from some.cache import FlipCache
+from some.convexify import convexify
+from some.geometry import PointArray, Points, getPerimeter
+from some.polyfile import PolygonFile
+from some.timing import timed
+
+
+@dataclass
+class PolygonStats:
+    flips: int
+    perimeter: float  # of the final polygon
+    points: PointArray  # final vertex positions
+
+
+# Convexifies a chunk of polygons of the shared buffer in place and returns
+# (flips, perimeter) for each of them. `offsets` are the chunk's polygon
+# boundaries, one more than there are polygons, so only they are pickled.
+def _convexifyChunk(
+    name: str,
+    total: int,
+    offsets: np.ndarray,
+    method: str,
+    max_flips: Optional[int],
+    cache: Optional[FlipCache],
+) -> list[tuple[int, float]]:
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        coords = np.ndarray((total, 3), dtype=np.float64, buffer=shm.buf)
+        stats = []
+        for k in range(len(offsets) - 1):
+            polygon = coords[offsets[k] : offsets[k + 1]]
+            result = convexify(PointArray(polygon), method, max_flips, cache)
+            polygon[:] = result.points.coords
+            stats.append((result.flips, getPerimeter(result.points)))
+            del polygon  # views into the buffer have to be gone before close()
+        del coords
+        return stats
+    finally:
+        shm.close()
+
+
+# Convexifies every polygon on a pool of `workers` processes (all cores by
+# default) and returns their stats in input order. Polygons are handed out
+# `chunk_size` at a time; by default every worker gets about four chunks. With a
+# cache, polygons convexified before are looked up instead. A PolygonFile is
+# copied into shared memory straight from its memory map.
+@timed()
+def convexifyBatch(
+    polygons: Iterable[Points],
+    method: str = "hull",
+    max_flips: Optional[int] = None,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    cache: Optional[FlipCache] = None,
+) -> list[PolygonStats]:
+    if isinstance(polygons, PolygonFile):
+        # Already laid out like the shared buffer, copied over in one go
+        offsets = np.array(polygons.offsets, dtype=np.int64)
+        source = polygons.coords
+    else:
+        arrays = [PointArray(polygon).coords for polygon in polygons]
+        offsets = np.cumsum([0] + [len(a) for a in arrays])
+        source = np.concatenate(arrays) if arrays else np.empty((0, 3))
+    count = len(offsets) - 1
+    if count == 0:
+        return []
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or math.ceil(count / (4 * workers))
+    total = int(offsets[-1])
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, total * 3 * 8))
+    try:
+        coords = np.ndarray((total, 3), dtype=np.float64, buffer=shm.buf)
+        coords[:] = source
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    _convexifyChunk,
+                    shm.name,
+                    total,
+                    offsets[first : min(first + chunk_size, count) + 1],
+                    method,
+                    max_flips,
+                    cache,
+                )
+                for first in range(0, count, chunk_size)
+            ]
+            stats = [s for future in futures for s in future.result()]
+        results = [
+            PolygonStats(flips, perimeter, PointArray(coords[start:end]))
+            for (flips, perimeter), start, end in zip(stats, offsets, offsets[1:])
+        ]
+        del coords
+        return results
+    finally:
+        shm.close()
+        shm.unlink()
@@ -0,0 +1,187 @@
+# Benchmarks the geometry hot paths on the seeded polygons of some.generators.
+# Every function is timed over repeated calls for throughput, then called once
+# more under tracemalloc for its peak memory. Run with
+#
+#   python -m some.benchmark --sizes 10 1000 100000 --json results.json
+#
+# and compare the JSON files of two runs to spot regressions.
+
+import argparse
+import json
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional
+
+from some.generators import GENERATORS
+from some.geometry import (
+    ExtremalIndex,
+    PointArray,
+    convexCheck,
+    convexity_tolerance,
+    findFlip,
+    flip,
+    flip_range,
+    getHullPoints,
+    projectPointsOnLine,
+    searchFlip,
+)
+
+SIZES = [10, 100, 1000, 10_000, 100_000]
+
+
+Call = Callable[[PointArray], object]
+
+
+# Each benchmark does its preparation on the polygon once and returns the call
+# to time. Calls that modify the polygon get a fresh copy every time.
+def _convexCheck(points: PointArray) -> Call:
+    return lambda p: convexCheck(p[0], p[2], p)
+
+
+def _extremalIndex(points: PointArray) -> Call:
+    index = ExtremalIndex(points)
+    index.cycle()  # built once, outside the timing
+    return lambda p: convexCheck(p[0], p[2], p, index)
+
+
+def _flip(points: PointArray) -> Call:
+    i, j = searchFlip(points) or (0, 2)
+    return lambda p: flip(p[i], p[j], p)
+
+
+def _flipRange(points: PointArray) -> Call:
+    i, j = searchFlip(points) or (0, 2)
+    return lambda p: flip_range(i, j, p)
+
+
+def _projectPointsOnLine(points: PointArray) -> Call:
+    return lambda p: projectPointsOnLine(0, len(p) // 2, p)
+
+
+def _getHullPoints(points: PointArray) -> Call:
+    return getHullPoints
+
+
+def _findFlip(points: PointArray) -> Call:
+    return findFlip
+
+
+def _convexityTolerance(points: PointArray) -> Call:
+    return convexity_tolerance
+
+
+BENCHMARKS: dict[str, tuple[Callable[[PointArray], Call], bool]] = {
+    # name: (setup, whether the call modifies the polygon)
+    "convexCheck": (_convexCheck, False),
+    "extremalIndex": (_extremalIndex, False),
+    "flip": (_flip, True),
+    "flip_range": (_flipRange, True),
+    "projectPointsOnLine": (_projectPointsOnLine, False),
+    "getHullPoints": (_getHullPoints, False),
+    "findFlip": (_findFlip, True),
+    "convexity_tolerance": (_convexityTolerance, False),
+}
+
+
+@dataclass
+class BenchmarkResult:
+    function: str
+    shape: str
+    size: int
+    calls: int
+    seconds: float  # total time of all calls
+    peak_bytes: int  # peak traced memory during one call
+
+    @property
+    def callsPerSecond(self) -> float:
+        return self.calls / self.seconds
+
+    @property
+    def verticesPerSecond(self) -> float:
+        return self.calls * self.size / self.seconds
+
+
+# Times the benchmark until at least `min_time` seconds and `min_calls` calls
+# were spent in it, then measures the peak memory of one more call
+def runBenchmark(
+    function: str,
+    shape: str,
+    size: int,
+    seed: int = 0,
+    min_time: float = 0.2,
+    min_calls: int = 3,
+) -> BenchmarkResult:
+    setup, mutates = BENCHMARKS[function]
+    points = GENERATORS[shape](size, seed)
+    call = setup(points)
+    calls = 0
+    seconds = 0.0
+    while seconds < min_time or calls < min_calls:
+        polygon = points.copy() if mutates else points
+        start = time.perf_counter()
+        call(polygon)
+        seconds += time.perf_counter() - start
+        calls += 1
+
+    polygon = points.copy() if mutates else points
+    tracemalloc.start()
+    try:
+        call(polygon)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return BenchmarkResult(function, shape, size, calls, seconds, peak)
+
+
+def runBenchmarks(
+    functions: Optional[list[str]] = None,
+    shapes: Optional[list[str]] = None,
+    sizes: Optional[list[int]] = None,
+    seed: int = 0,
+    min_time: float = 0.2,
+) -> list[BenchmarkResult]:
+    results = []
+    for function in functions or list(BENCHMARKS):
+        for shape in shapes or list(GENERATORS):
+            for size in sizes or SIZES:
+                result = runBenchmark(function, shape, size, seed, min_time)
+                print(
+                    f"{function:>20} {shape:>12} {size:>7}"
+                    f" {result.callsPerSecond:>12.1f} calls/s"
+                    f" {result.verticesPerSecond:>14.0f} vertices/s"
+                    f" {result.peak_bytes / 2**20:>9.2f} MiB",
+                    flush=True,
+                )
+                results.append(result)
+    return results
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the geometry hot paths on seeded polygons"
+    )
+    parser.add_argument("--functions", nargs="+", choices=list(BENCHMARKS))
+    parser.add_argument("--shapes", nargs="+", choices=list(GENERATORS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="seconds to time every case for"
+    )
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = runBenchmarks(
+        args.functions, args.shapes, args.sizes, args.seed, args.min_time
+    )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(
+                {"seed": args.seed, "results": [asdict(r) for r in results]},
+                f,
+                indent=2,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# An on-disk cache of flip sequences. Entries are addressed by a hash of the
+# polygon's vertex array, so the same polygon is only ever convexified once,
+# across renders and batch jobs. An entry holds as much of the sequence as has
+# been computed so far, and is marked complete once it ends convex (see
+# flipDeltas). The least recently used entries are dropped once the cache grows
+# past its size limit. Entries are flip files (see some.polyfile), so hits are
+# memory-mapped rather than read.
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from some.convexify import FlipDelta
+from some.geometry import PointArray, Points
+from some.polyfile import FlipFile, writeFlips
+
+FORMAT_VERSION = 3
+
+
+def defaultCacheDirectory() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "some" / "flips"
+
+
+class FlipCache:
+    def __init__(
+        self, directory: Optional[Path] = None, max_bytes: int = 256 * 2**20
+    ) -> None:
+        self.directory = Path(directory or defaultCacheDirectory())
+        self.max_bytes = max_bytes
+
+    def key(self, points: Points, method: str = "hull") -> str:
+        coords = np.ascontiguousarray(PointArray(points).coords, dtype="<f8")
+        digest = hashlib.sha256(f"{FORMAT_VERSION}:{method}:{coords.shape}:".encode())
+        digest.update(coords.tobytes())
+        return digest.hexdigest()
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}.flips"
+
+    # Returns the cached flip file of the polygon, or None
+    def get(self, points: Points, method: str = "hull") -> Optional[FlipFile]:
+        path = self.path(self.key(points, method))
+        try:
+            entry = FlipFile(path)
+        except (OSError, ValueError):
+            return None  # missing or unreadable, recompute it
+        try:
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            pass  # evicted by another process in the meantime
+        return entry
+
+    # Stores the start of the flip sequence of the polygon, or all of it if
+    # complete
+    def put(
+        self,
+        points: Points,
+        deltas: list[FlipDelta],
+        method: str = "hull",
+        complete: bool = False,
+    ) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        descriptor, name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(descriptor)
+        writeFlips(name, points, deltas, complete)
+        # Renaming is atomic, so other processes never see half an entry
+        os.replace(name, self.path(self.key(points, method)))
+        self.evict()
+
+    # Deletes the least recently used entries until the cache fits in max_bytes
+    def evict(self) -> None:
+        entries = []
+        for path in self.directory.glob("*.flips"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # evicted by another process
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,82 @@
+# Plans where the camera goes while a flip sequence plays: the bounding box of
+# every flip state is found in one pass, turned into the smallest frame that
+# shows it, and the frames are smoothed into a path that still shows every
+# state. Frames are [x, y, width] like the render plan's cameras.
+
+from typing import Optional
+
+import numpy as np
+
+ASPECT = 16 / 9  # manim's default frame is 128/9 by 8 units
+
+
+# The bounding boxes of a (states, n, 3) array, a (states, 4) array of
+# min x, min y, max x and max y
+def stateBounds(states: np.ndarray) -> np.ndarray:
+    planar = np.asarray(states, dtype=np.float64)[..., :2]
+    return np.concatenate((planar.min(axis=-2), planar.max(axis=-2)), axis=-1)
+
+
+# The width a frame centred at (x, y) needs to show each box with `margin`
+# times its size around it. Unlike getCameraWidth, the height counts too.
+def _neededWidths(
+    bounds: np.ndarray, centers: np.ndarray, aspect: float, margin: float
+) -> np.ndarray:
+    half_x = np.maximum(bounds[:, 2] - centers[:, 0], centers[:, 0] - bounds[:, 0])
+    half_y = np.maximum(bounds[:, 3] - centers[:, 1], centers[:, 1] - bounds[:, 1])
+    return 2 * np.maximum(half_x, half_y * aspect) * margin
+
+
+# Returns the frames that just show every box, a (states, 3) array
+def fitFrames(
+    bounds: np.ndarray, aspect: float = ASPECT, margin: float = 1.3
+) -> np.ndarray:
+    centers = (bounds[:, :2] + bounds[:, 2:]) / 2
+    widths = _neededWidths(bounds, centers, aspect, margin)
+    return np.column_stack((centers, widths))
+
+
+# Smooths the rows of the array with a Gaussian of `sigma` rows, repeating the
+# first and last rows at the ends
+def _smooth(values: np.ndarray, sigma: float) -> np.ndarray:
+    if sigma <= 0 or len(values) < 2:
+        return values.copy()
+    radius = int(np.ceil(3 * sigma))
+    kernel = np.exp(-0.5 * (np.arange(-radius, radius + 1) / sigma) ** 2)
+    kernel /= kernel.sum()
+    padded = np.concatenate(
+        (
+            np.repeat(values[:1], radius, axis=0),
+            values,
+            np.repeat(values[-1:], radius, axis=0),
+        )
+    )
+    # Every column at once: windows of the padded rows times the kernel
+    windows = np.lib.stride_tricks.sliding_window_view(padded, len(kernel), axis=0)
+    return windows @ kernel
+
+
+# Plans the camera for a (states, n, 3) flip sequence: one frame per state,
+# smoothed over `sigma` states, then widened wherever the smoothing would cut
+# off part of that state. With `start` (an [x, y, width] frame) the path eases
+# out of it over the first states instead of jumping.
+def cameraPath(
+    states: np.ndarray,
+    aspect: float = ASPECT,
+    margin: float = 1.3,
+    sigma: float = 1.0,
+    start: Optional[list[float]] = None,
+) -> np.ndarray:
+    bounds = stateBounds(states)
+    if len(bounds) == 0:
+        return np.empty((0, 3))
+    frames = fitFrames(bounds, aspect, margin)
+    if start is not None:
+        frames = np.concatenate(([start], frames))
+    path = _smooth(frames, sigma)
+    if start is not None:
+        path = path[1:]
+    path[:, 2] = np.maximum(
+        path[:, 2], _neededWidths(bounds, path[:, :2], aspect, margin)
+    )
+    return path
@@ -0,0 +1,319 @@
+# Command line interface to the geometry, e.g.
+#
+#   python -m some convexify polygon.json --epsilon 0.01
+#   python -m some hull polygon.json
+#   python -m some pack *.json -o corpus.poly
+#   python -m some batch corpus.poly --points convex.poly
+#   python -m some render --tier draft
+#   python -m some render --tier dry-run
+#   python -m some contact-sheet media/dry_run/timeline.json -o sheet.svg
+#
+# A polygon file holds a JSON list of [x, y] or [x, y, z] vertices, or an
+# object with such a list under "points"; a binary polygon file (.poly, see
+# some.polyfile) stands for its first polygon. Results are printed as JSON. Only
+# `render` loads manim; every other command needs nothing but NumPy, and each
+# one imports just the modules it uses so that they start up fast.
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from some.cache import FlipCache
+    from some.geometry import PointArray
+
+SCENE = "CreateConcavePolygon"
+DRY_RUN_SCENE = "DryRunConcavePolygon"
+
+# manim's arguments for each render quality. A dry run draws no frames; it
+# writes the timeline and contact sheet of the scene (see some.timeline).
+QUALITY_TIERS = {
+    "draft": ["-ql"],  # 854x480, 15 fps
+    "preview": ["-qm"],  # 1280x720, 30 fps
+    "final": ["-qh"],  # 1920x1080, 60 fps, what the flake renders
+    "dry-run": [],
+}
+
+
+def _readPolygon(path: str) -> "PointArray":
+    import numpy as np
+
+    from some.geometry import PointArray
+
+    if path.endswith(".poly"):
+        from some.polyfile import PolygonFile
+
+        return PolygonFile(path)[0]
+    with open(path) if path != "-" else sys.stdin as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data["points"]
+    return PointArray(np.array(data, dtype=np.float64).reshape(len(data), -1))
+
+
+def _write(result: Any, output: Optional[str]) -> None:
+    text = json.dumps(result, indent=2)
+    if output:
+        Path(output).write_text(text + "\n")
+    else:
+        print(text)
+
+
+def _cache(args: argparse.Namespace) -> Optional["FlipCache"]:
+    if args.no_cache:
+        return None
+    from some.cache import FlipCache
+
+    return FlipCache(args.cache_dir)
+
+
+def _convexify(args: argparse.Namespace) -> None:
+    from some.convexify import convexify, flipDeltas
+
+    polygon = _readPolygon(args.polygon)
+    cache = _cache(args)
+    result = convexify(
+        polygon,
+        args.method,
+        args.max_flips,
+        cache,
+        args.epsilon,
+        args.count_saved,
+    )
+    if args.flips:
+        from some.polyfile import writeFlips
+
+        # The flips done are the start of the whole sequence, cached by now
+        deltas = list(flipDeltas(polygon, args.method, result.flips, cache))
+        # Stopping for anything but convexity leaves the sequence unfinished
+        convex = args.epsilon is None and (
+            args.max_flips is None or result.flips < args.max_flips
+        )
+        writeFlips(args.flips, polygon, deltas, convex)
+    _write(
+        {
+            "flips": result.flips,
+            "saved": result.saved,
+            "points": result.points.coords.tolist(),
+        },
+        args.output,
+    )
+
+
+def _pack(args: argparse.Namespace) -> None:
+    from some.polyfile import PolygonFile, writePolygons
+
+    writePolygons(
+        args.output,
+        (
+            polygon
+            for path in args.polygons
+            for polygon in (
+                PolygonFile(path) if path.endswith(".poly") else [_readPolygon(path)]
+            )
+        ),
+    )
+
+
+def _batch(args: argparse.Namespace) -> None:
+    from some.batch import convexifyBatch
+    from some.polyfile import PolygonFile
+
+    results = convexifyBatch(
+        PolygonFile(args.polygons),
+        args.method,
+        args.max_flips,
+        args.workers,
+        cache=_cache(args),
+    )
+    if args.points:
+        from some.polyfile import writePolygons
+
+        writePolygons(args.points, (result.points for result in results))
+    _write([{"flips": r.flips, "perimeter": r.perimeter} for r in results], args.output)
+
+
+def _hull(args: argparse.Namespace) -> None:
+    from some.geometry import getHullPoints
+
+    hull = getHullPoints(_readPolygon(args.polygon), args.method)
+    _write({"points": hull.coords.tolist()}, args.output)
+
+
+def _tolerance(args: argparse.Namespace) -> None:
+    from some.geometry import convexity_tolerance
+
+    epsilon, vertex = convexity_tolerance(_readPolygon(args.polygon))
+    _write({"epsilon": epsilon, "vertex": vertex}, args.output)
+
+
+def _wiggle(args: argparse.Namespace) -> None:
+    from some.wiggle import wiggleStats
+
+    stats = wiggleStats(
+        _readPolygon(args.polygon),
+        args.epsilon,
+        args.trials,
+        args.seed,
+        args.distribution,
+        not args.open,
+    )
+    _write(
+        {
+            "trials": stats.trials,
+            "convex": stats.convex,
+            "convex_fraction": stats.convexFraction,
+            "min_angle": stats.min_angle,
+            "max_angle": stats.max_angle,
+        },
+        args.output,
+    )
+
+
+def _plan(args: argparse.Namespace) -> None:
+    from some.cache import FlipCache
+    from some.plan import buildRenderPlan
+
+    plan = buildRenderPlan(None if args.no_cache else FlipCache(args.cache_dir))
+    text = plan.toJson()
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+
+def _benchmark(args: argparse.Namespace) -> None:
+    from some.benchmark import main
+
+    main(args.arguments)
+
+
+# Renders the video with manim's own command line, which is only imported here
+def _render(args: argparse.Namespace) -> None:
+    from manim.__main__ import main  # type: ignore
+
+    scene_file = Path(__file__).resolve().parent.parent / "main.py"
+    scene = DRY_RUN_SCENE if args.tier == "dry-run" else SCENE
+    tier = QUALITY_TIERS[args.tier] if args.tier else []
+    main(
+        ["render", *tier, *args.arguments, str(scene_file), scene],
+        standalone_mode=True,
+    )
+
+
+def _contactSheet(args: argparse.Namespace) -> None:
+    from some.timeline import Timeline, contactSheet, keyFrames
+
+    timeline = Timeline.fromJson(Path(args.timeline).read_text())
+    sheet = contactSheet(keyFrames(timeline.frames, args.limit), args.columns)
+    if args.output:
+        Path(args.output).write_text(sheet)
+    else:
+        print(sheet, end="")
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="python -m some", description="Convex polygons by flipping pockets"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def command(
+        name: str, help: str, polygon: bool = True, output: bool = False
+    ) -> argparse.ArgumentParser:
+        sub = commands.add_parser(name, help=help, description=help)
+        if polygon:
+            sub.add_argument("polygon", help="polygon JSON or .poly file, - for stdin")
+        sub.add_argument(
+            "--output", "-o", required=output, help="write the result to this file"
+        )
+        return sub
+
+    def caching(sub: argparse.ArgumentParser) -> None:
+        sub.add_argument("--cache-dir", type=Path, help="flip cache directory")
+        sub.add_argument(
+            "--no-cache", action="store_true", help="don't read or write the cache"
+        )
+
+    sub = command("convexify", "Convexifies a polygon by flipping its pockets")
+    sub.add_argument("--method", choices=["hull", "bruteforce"], default="hull")
+    sub.add_argument("--max-flips", type=int)
+    sub.add_argument(
+        "--epsilon", type=float, help="stop once convex up to this tolerance"
+    )
+    sub.add_argument(
+        "--count-saved",
+        action="store_true",
+        help="with --epsilon, count the flips the exact run would have needed",
+    )
+    sub.add_argument("--flips", help="write the flip sequence to this flip file")
+    caching(sub)
+    sub.set_defaults(run=_convexify)
+
+    sub = command(
+        "pack", "Packs polygons into one .poly file", polygon=False, output=True
+    )
+    sub.add_argument(
+        "polygons", nargs="+", help="polygon JSON files or whole .poly files"
+    )
+    sub.set_defaults(run=_pack)
+
+    sub = command("batch", "Convexifies every polygon of a .poly file", polygon=False)
+    sub.add_argument("polygons", help=".poly file")
+    sub.add_argument("--method", choices=["hull", "bruteforce"], default="hull")
+    sub.add_argument("--max-flips", type=int)
+    sub.add_argument("--workers", type=int, help="processes, all cores by default")
+    sub.add_argument("--points", help="write the convex polygons to this .poly file")
+    caching(sub)
+    sub.set_defaults(run=_batch)
+
+    sub = command("hull", "Prints the hull points of a polygon")
+    sub.add_argument("--method", choices=["melkman", "giftwrap"], default="melkman")
+    sub.set_defaults(run=_hull)
+
+    sub = command("tolerance", "Prints the convexity tolerance of a polygon")
+    sub.set_defaults(run=_tolerance)
+
+    sub = command("wiggle", "Monte-Carlo statistics of wiggled copies of a polygon")
+    sub.add_argument("--epsilon", type=float, required=True)
+    sub.add_argument("--trials", type=int, default=1_000_000)
+    sub.add_argument("--seed", type=int)
+    sub.add_argument(
+        "--distribution", choices=["disc", "radius", "circle"], default="disc"
+    )
+    sub.add_argument(
+        "--open", action="store_true", help="the points are an open polyline"
+    )
+    sub.set_defaults(run=_wiggle)
+
+    sub = command(
+        "contact-sheet", "Draws key frames of a dry run timeline as SVG", polygon=False
+    )
+    sub.add_argument("timeline", help="timeline.json of a dry run")
+    sub.add_argument("--columns", type=int, default=4)
+    sub.add_argument("--limit", type=int, default=48, help="at most this many frames")
+    sub.set_defaults(run=_contactSheet)
+
+    sub = command("plan", "Prints the render plan of the video", polygon=False)
+    caching(sub)
+    sub.set_defaults(run=_plan)
+
+    # These pass all the arguments they don't know on
+    passing = {}
+    for name, help, run in [
+        ("benchmark", "Runs some.benchmark with the given arguments", _benchmark),
+        ("render", "Renders the video, passing the arguments on to manim", _render),
+    ]:
+        passing[name] = commands.add_parser(name, help=help, description=help)
+        passing[name].set_defaults(run=run)
+    passing["render"].add_argument(
+        "--tier", choices=list(QUALITY_TIERS), help="render quality"
+    )
+
+    args, arguments = parser.parse_known_args(argv)
+    if arguments and args.command not in passing:
+        parser.error(f"unrecognized arguments: {' '.join(arguments)}")
+    args.arguments = arguments
+    args.run(args)
@@ -0,0 +1,214 @@
+# Runs the Erdős–Nagy flip sequence without touching manim, so that batch jobs
+# only need NumPy and the scene just plays back the states it is given.
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterator, Optional, Union
+
+import numpy as np
+
+from some.geometry import (
+    IncrementalHull,
+    PointArray,
+    Points,
+    flip_range,
+    searchFlip,
+    vertexTolerances,
+)
+from some.timing import timed
+
+if TYPE_CHECKING:
+    from some.cache import FlipCache
+
+
+# What one flip changed: the `count` vertices from index `start` on (wrapping
+# around) were reflected across the chord between the pivots and now sit at
+# `coords`. Only the pocket is stored, so long flip sequences stay small.
+@dataclass
+class FlipDelta:
+    flip: int  # how many flips have been done, counting this one
+    pivots: tuple[int, int]
+    start: int
+    count: int
+    coords: np.ndarray  # (count, 3)
+
+    def indices(self, n: int) -> np.ndarray:
+        return np.arange(self.start, self.start + self.count) % n
+
+    # Replays the flip on a polygon that is in the state before it
+    def apply(self, points: PointArray) -> None:
+        points.coords[self.indices(len(points))] = self.coords
+
+
+# The polygon right after one flip
+@dataclass
+class ConvexifyStep:
+    flip: int  # how many flips have been done, counting this one
+    pivots: tuple[int, int]  # the vertices the pocket was flipped across
+    points: PointArray
+    hull: Optional[PointArray] = None  # see getHullPoints, only if asked for
+
+
+@dataclass
+class ConvexifyResult:
+    points: PointArray
+    flips: int
+    # How many more flips the exact run needed after stopping within the
+    # tolerance, if they were counted
+    saved: Optional[int] = None
+
+
+# Whether the polygon is convex up to `epsilon`: every reflex vertex can be
+# made flat by moving it and its neighbours by at most epsilon, the same
+# per-vertex radius the Eduard section uses for convex polygons
+def withinTolerance(points: Points, epsilon: float) -> bool:
+    return len(points) == 0 or bool(vertexTolerances(points).min() >= -epsilon)
+
+
+# Yields the delta of every flip until the polygon is convex (or `max_flips`
+# flips were done). With an `epsilon`, stops as soon as the polygon is within
+# that tolerance (see withinTolerance) instead. The given points are left
+# untouched; apply the deltas in order to a copy of them to follow along. With
+# a cache, the flips it already has are replayed and only the rest are
+# searched for; if that got further than the cached entry, the flips done so
+# far are stored once the sequence is used up.
+def flipDeltas(
+    points: Points,
+    method: str = "hull",
+    max_flips: Optional[int] = None,
+    cache: Optional["FlipCache"] = None,
+    epsilon: Optional[float] = None,
+) -> Iterator[FlipDelta]:
+    cached: list[FlipDelta] = []
+    complete = False
+    if cache is not None:
+        entry = cache.get(points, method)
+        if entry is not None:
+            cached, complete = entry.deltas(), entry.complete
+    if epsilon is None and (
+        complete or (max_flips is not None and len(cached) >= max_flips)
+    ):
+        yield from cached[:max_flips]
+        return
+    # The caller may be applying the deltas to the points it passed
+    original = PointArray(points)
+    points = original.copy()
+    n = len(points)
+    count = 0
+    for delta in cached[:max_flips]:
+        if epsilon is not None and withinTolerance(points, epsilon):
+            return
+        delta.apply(points)
+        count = delta.flip
+        yield delta
+    done = complete
+    searched = []
+    while not done and (max_flips is None or count < max_flips):
+        if epsilon is not None and withinTolerance(points, epsilon):
+            break
+        found = searchFlip(points, method)
+        if found is None:
+            done = True
+            break
+        i, j = found
+        flip_range(i, j, points)
+        count += 1
+        start = (i + 1) % n
+        pocket = np.arange(start, start + (j - start) % n) % n
+        delta = FlipDelta(count, found, start, len(pocket), points.coords[pocket])
+        searched.append(delta)
+        yield delta
+    if cache is not None and (searched or done != complete):
+        cache.put(original, cached + searched, method, done)
+
+
+# Yields the polygon after every flip, see flipDeltas. With hull=True every
+# step also carries the hull of the polygon, kept up to date with IncrementalHull.
+def convexifySteps(
+    points: Points,
+    method: str = "hull",
+    max_flips: Optional[int] = None,
+    hull: bool = False,
+    cache: Optional["FlipCache"] = None,
+    epsilon: Optional[float] = None,
+) -> Iterator[ConvexifyStep]:
+    points = PointArray(points)
+    tracker = IncrementalHull(points) if hull else None
+    for delta in flipDeltas(points, method, max_flips, cache, epsilon):
+        delta.apply(points)
+        if tracker is not None:
+            tracker.update(*delta.pivots)
+        yield ConvexifyStep(
+            delta.flip,
+            delta.pivots,
+            points.copy(),
+            tracker.hullPoints() if tracker is not None else None,
+        )
+
+
+# Convexifies the polygon and returns the convex polygon and the number of
+# flips. With an `epsilon` it stops once the polygon is within that tolerance;
+# count_saved=True then also runs the exact sequence to the end (still at most
+# `max_flips` flips in total) to report how many flips stopping early saved.
+@timed()
+def convexify(
+    points: Points,
+    method: str = "hull",
+    max_flips: Optional[int] = None,
+    cache: Optional["FlipCache"] = None,
+    epsilon: Optional[float] = None,
+    count_saved: bool = False,
+) -> ConvexifyResult:
+    original = points
+    points = PointArray(points)
+    count = 0
+    for delta in flipDeltas(points, method, max_flips, cache, epsilon):
+        delta.apply(points)
+        count = delta.flip
+    saved = None
+    if epsilon is not None and count_saved:
+        if cache is not None:
+            # Picks up after the flips just stored, and stores the rest
+            saved = sum(1 for _ in flipDeltas(original, method, max_flips, cache))
+            saved -= count
+        else:
+            rest = None if max_flips is None else max_flips - count
+            saved = sum(1 for _ in flipDeltas(points, method, rest))
+    return ConvexifyResult(points, count, saved)
+
+
+# Groups a sequence of flip states, a (flips, n, 3) array starting from the
+# (n, 3) polygon `start`, into batches that each move some vertex by at least
+# `threshold` pixels at `pixels_per_unit` (the camera's pixel width over its
+# frame width, one for all states or one per state for a moving camera; a batch
+# is measured at the scale of the state it ends on). Returns the index of the
+# last state of every batch, so that states[batches] plays every visible change
+# and skips the rest; the flips at the end that stay below the threshold join
+# the last batch.
+def flipBatches(
+    states: np.ndarray,
+    start: np.ndarray,
+    pixels_per_unit: Union[float, np.ndarray],
+    threshold: float = 2.0,
+) -> np.ndarray:
+    planar = np.asarray(states, dtype=np.float64)[:, :, :2]
+    anchor = np.asarray(start, dtype=np.float64)[:, :2]
+    scale = np.broadcast_to(np.asarray(pixels_per_unit, dtype=np.float64), len(planar))
+    limit = threshold / scale
+    batches = []
+    k = 0
+    while k < len(planar):
+        # How far the states from k on are from the last batch, all at once
+        moved = np.hypot(*np.moveaxis(planar[k:] - anchor, -1, 0)).max(axis=1)
+        visible = np.flatnonzero(moved >= limit[k:])
+        if len(visible) == 0:
+            break
+        k += int(visible[0])
+        batches.append(k)
+        anchor = planar[k]
+        k += 1
+    if len(planar) > 0:
+        if len(batches) > 0:
+            batches[-1] = len(planar) - 1
+        else:
+            batches.append(len(planar) - 1)
+    return np.array(batches, dtype=np.int64)
@@ -0,0 +1,85 @@
+# Seeded generators of simple polygons with n vertices, used for benchmarks and
+# batch experiments. The same (n, seed) always gives the same polygon.
+
+import math
+
+import numpy as np
+
+from some.geometry import PointArray
+
+
+def _planar(x: np.ndarray, y: np.ndarray) -> PointArray:
+    return PointArray(np.stack((x, y), axis=1))
+
+
+# A polygon that is star-shaped around the origin, with random radii
+def starPolygon(n: int, seed: int = 0) -> PointArray:
+    rng = np.random.default_rng(seed)
+    angles = (np.arange(n) + 0.8 * rng.random(n)) / n * 2 * math.pi
+    radii = rng.uniform(0.2, 3, n)
+    return _planar(radii * np.cos(angles), radii * np.sin(angles))
+
+
+# A thick spiral arm winding outwards up to 10 times: half of the vertices go
+# out along its inner side and the rest come back along its outer side
+def spiralPolygon(n: int, seed: int = 0) -> PointArray:
+    rng = np.random.default_rng(seed)
+    inner = n // 2
+    turns = min(10, inner / 16)  # at least 16 vertices per turn
+    angles = []
+    for count in (inner, n - inner):
+        step = 2 * math.pi * turns / max(1, count - 1)
+        jitter = rng.uniform(-0.25, 0.25, count) * step
+        angles.append(2 * math.pi + np.linspace(0, 2 * math.pi * turns, count) + jitter)
+    # The arm's radius grows by 1 per turn, and it is half as wide
+    radii = [
+        angles[0] / (2 * math.pi) + rng.uniform(-0.05, 0.05, inner),
+        angles[1] / (2 * math.pi) + 0.5 + rng.uniform(-0.05, 0.05, n - inner),
+    ]
+    theta = np.concatenate((angles[0], angles[1][::-1]))
+    radius = np.concatenate((radii[0], radii[1][::-1]))
+    return _planar(radius * np.cos(theta), radius * np.sin(theta))
+
+
+# A comb: teeth of random width and height standing on a base, plus enough
+# vertices along the bottom of the base to make up n
+def combPolygon(n: int, seed: int = 0) -> PointArray:
+    if n < 6:
+        raise ValueError("A comb needs at least 6 vertices")
+    rng = np.random.default_rng(seed)
+    teeth = (n - 2) // 4
+    left = 2 * np.arange(teeth) + rng.uniform(0, 0.25, teeth)
+    right = left + rng.uniform(0.5, 1.5, teeth)
+    height = rng.uniform(0.5, 3, teeth)
+    x = np.stack((left, left, right, right), axis=1).ravel()
+    y = np.stack((np.zeros(teeth), height, height, np.zeros(teeth)), axis=1).ravel()
+
+    # The bottom runs from right to left below the teeth
+    bottom = n - 4 * teeth
+    bottom_x = np.linspace(2 * teeth, 0, bottom)
+    bottom_y = -1 - rng.uniform(0, 0.25, bottom)
+    return _planar(np.concatenate((x, bottom_x)), np.concatenate((y, bottom_y)))
+
+
+# An x-monotone polygon whose top and bottom are random walks. The top walks
+# over x = 0, 1, 2, ... and the bottom over the midpoints in between, always
+# at least 1 below the top there.
+def randomWalkPolygon(n: int, seed: int = 0) -> PointArray:
+    if n < 3:
+        raise ValueError("A polygon needs at least 3 vertices")
+    rng = np.random.default_rng(seed)
+    top = (n + 1) // 2 + (1 if n % 2 == 0 else 0)
+    bottom = n - top
+    top_y = np.cumsum(rng.uniform(-1, 1, top))
+    gap = 1 + np.abs(np.cumsum(rng.uniform(-1, 1, bottom)))
+    bottom_y = np.minimum(top_y[:bottom], top_y[1 : bottom + 1]) - gap
+    x = np.concatenate((np.arange(top), np.arange(bottom)[::-1] + 0.5))
+    return _planar(x.astype(np.float64), np.concatenate((top_y, bottom_y[::-1])))
+
+
+GENERATORS = {
+    "star": starPolygon,
+    "spiral": spiralPolygon,
+    "comb": combPolygon,
+    "random-walk": randomWalkPolygon,
+}
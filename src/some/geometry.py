@@ -0,0 +1,911 @@
+import bisect
+import collections
+import math
+from dataclasses import dataclass
+from functools import total_ordering
+from typing import Iterable, Iterator, Optional, Sequence, Union, overload
+
+import numpy as np
+
+from some.timing import timed
+
+
+# The methods shared by Point and FrozenPoint. Indexing and comparisons read
+# the coordinates directly instead of building a list every time.
+@total_ordering
+class BasePoint(Sequence[float]):
+    __slots__ = ()
+
+    x: float
+    y: float
+    z: float
+
+    def distanceFrom(self, p) -> float:
+        return math.sqrt(
+            (self.x - p.x) ** 2 + (self.y - p.y) ** 2 + (self.z - p.z) ** 2
+        )
+
+    @overload
+    def __getitem__(self, i: int) -> float:
+        pass
+
+    @overload
+    def __getitem__(self, i: slice) -> Sequence[float]:
+        pass
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[float, Sequence[float]]:
+        if isinstance(i, slice):
+            return (self.x, self.y, self.z)[i]
+        if i == 0 or i == -3:
+            return self.x
+        if i == 1 or i == -2:
+            return self.y
+        if i == 2 or i == -1:
+            return self.z
+        raise IndexError("Point index out of range")
+
+    def __len__(self) -> int:
+        return 3
+
+    def __iter__(self) -> Iterator[float]:
+        yield self.x
+        yield self.y
+        yield self.z
+
+    # Any two points with the same coordinates compare equal, whatever their class
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, BasePoint):
+            return NotImplemented
+        return self.x == other.x and self.y == other.y and self.z == other.z
+
+    def __lt__(self, other: "BasePoint") -> bool:
+        if self.x != other.x:
+            return self.x < other.x
+        if self.y != other.y:
+            return self.y < other.y
+        return self.z < other.z
+
+
+@dataclass(slots=True, eq=False)
+class Point(BasePoint):
+    x: float
+    y: float
+    z: float
+
+    def __setitem__(self, i: int, v: float) -> None:
+        if i == 0:
+            self.x = v
+        elif i == 1:
+            self.y = v
+        elif i == 2:
+            self.z = v
+        else:
+            raise KeyError()
+
+
+# An immutable, hashable Point, e.g. for dictionary keys or constants
+@dataclass(slots=True, frozen=True, eq=False)
+class FrozenPoint(BasePoint):
+    x: float
+    y: float
+    z: float
+
+    def __hash__(self) -> int:
+        return hash((self.x, self.y, self.z))
+
+
+def _coordinate(axis: int) -> property:
+    def get(self: "PointView") -> float:
+        return float(self._coords[self._index, axis])
+
+    def set(self: "PointView", v: float) -> None:
+        self._coords[self._index, axis] = v
+
+    return property(get, set)
+
+
+# A Point that reads and writes one row of a PointArray's coordinate array.
+# Copying a view gives a standalone Point.
+class PointView(Point):
+    __slots__ = ("_coords", "_index")
+
+    x = _coordinate(0)  # type: ignore
+    y = _coordinate(1)  # type: ignore
+    z = _coordinate(2)  # type: ignore
+
+    def __init__(self, coords: np.ndarray, index: int) -> None:
+        self._coords = coords
+        self._index = index
+
+    def __copy__(self) -> Point:
+        return Point(self.x, self.y, self.z)
+
+    def __deepcopy__(self, memo: dict) -> Point:
+        return Point(self.x, self.y, self.z)
+
+
+# A polygon stored as an (n, 3) float64 array of vertices. Indexing returns
+# PointViews, so code written against list[Point] keeps working.
+class PointArray(Sequence[Point]):
+    def __init__(self, points: Union[np.ndarray, Iterable[Sequence[float]]] = ()):
+        if isinstance(points, PointArray):
+            coords = points.coords.copy()
+        else:
+            if not isinstance(points, np.ndarray):
+                points = list(points)  # may be a generator
+            coords = np.array(points, dtype=np.float64)
+        if coords.size == 0:
+            coords = coords.reshape(0, 3)
+        if coords.shape[1] == 2:  # planar input, z = 0
+            coords = np.hstack((coords, np.zeros((len(coords), 1))))
+        self.coords: np.ndarray = coords
+
+    @overload
+    def __getitem__(self, i: int) -> Point:
+        pass
+
+    @overload
+    def __getitem__(self, i: slice) -> "PointArray":
+        pass
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[Point, "PointArray"]:
+        if isinstance(i, slice):
+            return PointArray(self.coords[i])
+        if i < -len(self.coords) or i >= len(self.coords):
+            raise IndexError("PointArray index out of range")
+        return PointView(self.coords, i % len(self.coords))
+
+    def __setitem__(self, i: int, p: Sequence[float]) -> None:
+        self.coords[i] = (p[0], p[1], p[2])
+
+    def __len__(self) -> int:
+        return len(self.coords)
+
+    def __iter__(self) -> Iterator[Point]:
+        for i in range(len(self.coords)):
+            yield PointView(self.coords, i)
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        return self.coords if dtype is None else self.coords.astype(dtype)
+
+    def __repr__(self) -> str:
+        return f"PointArray({self.coords.tolist()})"
+
+    def index(self, p: object, start: int = 0, stop: Optional[int] = None) -> int:
+        if not isinstance(p, Sequence):
+            raise ValueError(f"{p} is not in PointArray")
+        matches = np.flatnonzero(
+            (self.coords[start:stop] == (p[0], p[1], p[2])).all(axis=1)
+        )
+        if len(matches) == 0:
+            raise ValueError(f"{p} is not in PointArray")
+        return start + int(matches[0])
+
+    def copy(self) -> "PointArray":
+        return PointArray(self.coords.copy())
+
+    # Uses an (n, 3) float64 array as is, without copying it (it may be a
+    # read-only memory map)
+    @staticmethod
+    def wrap(coords: np.ndarray) -> "PointArray":
+        points = PointArray()
+        points.coords = coords
+        return points
+
+
+Points = Union[PointArray, list[Point]]
+
+
+# Returns the coordinates of `points` as an (n, 3) array. For a PointArray this
+# is the backing array itself, so writing into it changes the polygon.
+def asCoords(points: Points) -> np.ndarray:
+    if isinstance(points, PointArray):
+        return points.coords
+    return np.array([[p.x, p.y, p.z] for p in points], dtype=np.float64)
+
+
+# Index of the lexicographically smallest vertex (same as `points.index(min(points))`)
+def _minIndex(coords: np.ndarray) -> int:
+    return int(np.lexsort((coords[:, 2], coords[:, 1], coords[:, 0]))[0])
+
+
+# Relative error bound of the float determinant in _orient and _orientation.
+# Below it the sign can't be trusted and is recomputed exactly (Shewchuk,
+# "Adaptive Precision Floating-Point Arithmetic and Fast Robust Geometric
+# Predicates", 1997).
+_EPSILON = np.finfo(np.float64).eps / 2
+_ORIENTATION_ERROR = float((3 + 16 * _EPSILON) * _EPSILON)
+
+
+# Returns the sign (-1, 0 or 1) of (ax - cx) * (by - cy) - (ay - cy) * (bx - cx),
+# i.e. 1 if c, a, b turn counterclockwise. Exact: computed in floats when their
+# rounding can't change the sign, in integers otherwise.
+def _orient(ax: float, ay: float, bx: float, by: float, cx: float, cy: float) -> int:
+    left = (ax - cx) * (by - cy)
+    right = (ay - cy) * (bx - cx)
+    det = left - right
+    if abs(det) > _ORIENTATION_ERROR * (abs(left) + abs(right)):
+        return 1 if det > 0 else -1
+    if (ax == cx or by == cy) and (ay == cy or bx == cx):
+        return 0  # both products are exactly zero, e.g. axis-aligned points
+    # Every float is an integer over a power of two, so scaling them all to the
+    # largest denominator gives integers with the same orientation
+    ratios = [v.as_integer_ratio() for v in (ax, ay, bx, by, cx, cy)]
+    denominator = max(d for _, d in ratios)
+    ax, ay, bx, by, cx, cy = (n * (denominator // d) for n, d in ratios)
+    exact = (ax - cx) * (by - cy) - (ay - cy) * (bx - cx)
+    return (exact > 0) - (exact < 0)
+
+
+# Returns the side (-1, 0 or 1) of the points `p` relative to the AB lines,
+# exactly, like _orient. `a`, `b` and `p` are arrays of coordinates that
+# broadcast against each other.
+def _orientation(a: np.ndarray, b: np.ndarray, p: np.ndarray) -> np.ndarray:
+    ax, ay, bx, by = a[..., 0], a[..., 1], b[..., 0], b[..., 1]
+    px, py = p[..., 0], p[..., 1]
+    abx, aby, pbx, pby = ax - bx, ay - by, px - bx, py - by
+
+    # Only the determinants below the bound for the largest terms could have
+    # the wrong sign, the exact check in _orient sorts those out
+    def largest(v: np.ndarray) -> float:
+        return max(float(np.max(v)), -float(np.min(v))) if np.size(v) else 0.0
+
+    bound = _ORIENTATION_ERROR * (
+        largest(abx) * largest(pby) + largest(aby) * largest(pbx)
+    )
+    det = abx * pby
+    det -= aby * pbx
+    result = np.sign(det)
+    ambiguous = np.nonzero(np.abs(det, out=det) <= bound)
+    if len(ambiguous[0]):
+        coords = np.broadcast_arrays(ax, ay, px, py, bx, by)
+        for index in zip(*ambiguous):
+            result[index] = _orient(*(float(c[index]) for c in coords))
+    return result
+
+
+# Returns the side (-1, 0 or 1) of every vertex relative to the AB line
+def _sides(a: Sequence[float], b: Sequence[float], coords: np.ndarray) -> np.ndarray:
+    return _orientation(np.asarray(a[:2]), np.asarray(b[:2]), coords)
+
+
+# For two points `a` and `b`, return True if the entire polygon is on one side
+# of the AB line. Otherwise, return False. Pass the polygon's ExtremalIndex to
+# answer in O(log n) instead of scanning every vertex.
+def convexCheck(
+    a: Point, b: Point, points: Points, index: Optional["ExtremalIndex"] = None
+) -> bool:
+    if index is not None:
+        return index.oneSided((a.x, a.y), (b.x, b.y))
+    coords = asCoords(points)
+    if len(coords) == 0:
+        return True
+    sides = _sides((a.x, a.y), (b.x, b.y), coords)
+    return not (sides.max() > 0 and sides.min() < 0)
+
+
+# Answers convexCheck in O(log n): the vertices farthest on either side of a
+# line are hull vertices, found by binary search on the counterclockwise hull.
+# The hull is built lazily on the first query, so invalidate() after a flip is
+# free. A "not one-sided" answer comes from two real vertices on opposite sides
+# and is always exact; a "one-sided" answer can differ from convexCheck only
+# for vertices within a rounding error of the line.
+class ExtremalIndex:
+    def __init__(self, points: Points, cycle: Optional[Sequence[int]] = None) -> None:
+        self.points = points
+        self._cycle: Optional[list[int]] = None if cycle is None else list(cycle)
+        self._hull: Optional[list[list[float]]] = None
+
+    # Call after the polygon changed, e.g. after a flip
+    def invalidate(self) -> None:
+        self._cycle = None
+        self._hull = None
+
+    # The polygon's indices of the hull vertices, counterclockwise
+    def cycle(self) -> list[int]:
+        if self._cycle is None:
+            coords = asCoords(self.points)
+            self._cycle = _convexHullCycle(coords) if len(coords) else []
+        return self._cycle
+
+    def _hullCoords(self) -> list[list[float]]:
+        if self._hull is None:
+            self._hull = asCoords(self.points)[self.cycle(), :2].tolist()
+        return self._hull
+
+    # Returns the polygon index of a vertex farthest in the direction (dx, dy)
+    def extreme(self, dx: float, dy: float) -> int:
+        hull = self._hullCoords()
+        h = len(hull)
+        dx, dy = float(dx), float(dy)
+
+        def height(k: int) -> float:
+            x, y = hull[k % h]
+            return x * dx + y * dy
+
+        # The sign of the change in height going from vertex k to vertex l
+        def change(k: int, l: int) -> int:
+            difference = height(l) - height(k)
+            return (difference > 0) - (difference < 0)
+
+        def isExtreme(k: int) -> bool:
+            return change(k, k + 1) <= 0 and change(k - 1, k) > 0
+
+        # Binary search on the cyclic sequence of heights, which rises to the
+        # extreme vertex and then falls back
+        if isExtreme(0):
+            return self.cycle()[0]
+        lo, hi = 0, h
+        while lo + 1 < hi:
+            mid = (lo + hi) // 2
+            if isExtreme(mid):
+                return self.cycle()[mid]
+            lo_change, mid_change = change(lo, lo + 1), change(mid, mid + 1)
+            if lo_change > mid_change or (
+                lo_change == mid_change and lo_change == change(mid, lo)
+            ):
+                hi = mid
+            else:
+                lo = mid
+        return self.cycle()[lo % h]
+
+    # For two points `a` and `b`, returns True if the entire polygon is on one
+    # side of the AB line, like convexCheck(a, b, points)
+    def oneSided(self, a: Sequence[float], b: Sequence[float]) -> bool:
+        if len(self.cycle()) < 3:
+            coords = asCoords(self.points)
+            if len(coords) == 0:
+                return True
+            sides = _sides(a, b, coords)  # flat polygon
+            return not (sides.max() > 0 and sides.min() < 0)
+        ax, ay, bx, by = float(a[0]), float(a[1]), float(b[0]), float(b[1])
+        coords = asCoords(self.points)
+        # The vertices farthest to the left and right of AB
+        p = coords[self.extreme(by - ay, ax - bx)]
+        q = coords[self.extreme(ay - by, bx - ax)]
+        high = _orient(ax, ay, float(p[0]), float(p[1]), bx, by)
+        low = _orient(ax, ay, float(q[0]), float(q[1]), bx, by)
+        return not (high > 0 and low < 0)
+
+
+# Reflects `coords` across the line through a and b, in place. Goes through the
+# projection onto AB rather than its slope, so steep and vertical lines work too.
+def _reflect(a: Sequence[float], b: Sequence[float], coords: np.ndarray) -> None:
+    ax, ay = a[0], a[1]
+    dx, dy = b[0] - ax, b[1] - ay
+    length = dx * dx + dy * dy
+    if length == 0:
+        return  # no line to reflect across
+    x, y = coords[:, 0], coords[:, 1]
+    t = ((x - ax) * dx + (y - ay) * dy) / length
+    x_reflected = 2 * (ax + t * dx) - x
+    coords[:, 1] = 2 * (ay + t * dy) - y
+    coords[:, 0] = x_reflected
+
+
+# Reflects the vertices strictly between the indices i and j (wrapping around)
+# across the line through vertices i and j. Only the pocket is read and written,
+# as at most two contiguous slices of a PointArray.
+@timed()
+def flip_range(i: int, j: int, points: Points) -> None:
+    n = len(points)
+    start = (i + 1) % n
+    count = (j - start) % n
+    a, b = (points[i].x, points[i].y), (points[j].x, points[j].y)
+    if isinstance(points, PointArray):
+        coords = points.coords
+        _reflect(a, b, coords[start : min(start + count, n)])
+        if start + count > n:
+            _reflect(a, b, coords[: start + count - n])
+        return
+    indices = [(start + k) % n for k in range(count)]
+    pocket = np.array([[points[k].x, points[k].y] for k in indices]).reshape(-1, 2)
+    _reflect(a, b, pocket)
+    for k, (x, y) in zip(indices, pocket.tolist()):
+        points[k].x, points[k].y = x, y
+
+
+# Flips between a and b points, sets the coordinates in the points list
+def flip(a: Point, b: Point, points: Points) -> None:
+    flip_range(points.index(a), points.index(b), points)
+
+
+# Projects the vertices strictly between the indices a and b onto the AB segment.
+# Projections never move backwards along the segment, nor past b.
+def _projectCoords(a: int, b: int, coords: np.ndarray) -> np.ndarray:
+    n = len(coords)
+    indices = np.arange(a + 1, b if a <= b else b + n) % n
+    v1 = coords[b] - coords[a]
+    v1Length = math.sqrt(v1[0] ** 2 + v1[1] ** 2 + v1[2] ** 2)
+    v2 = coords[indices] - coords[a]
+    dotProduct = v1[0] * v2[:, 0] + v1[1] * v2[:, 1] + v1[2] * v2[:, 2]
+    lengthfactor = np.minimum(
+        np.maximum.accumulate(np.maximum(dotProduct / (v1Length**2), 0.0)), 1.0
+    )
+    return v1 * lengthfactor[:, np.newaxis] + coords[a]
+
+
+# Project points in `points` between the indices a and b on the line defined by the point a and b
+def projectPointsOnLine(a: int, b: int, points: Points) -> PointArray:
+    return PointArray(_projectCoords(a, b, asCoords(points)))
+
+
+def rotateList(l: list[Point], first_index: int) -> list[Point]:
+    return l[first_index:] + l[:first_index]
+
+
+# Builds the "rubber band" around the polygon: vertex k of the result is vertex k
+# itself if it is on the hull (`hull` is the sorted list of hull vertex indices),
+# otherwise its projection onto the hull edge that spans it
+def rubberBand(hull: Sequence[int], coords: np.ndarray) -> np.ndarray:
+    band = coords.copy()
+    for last, i in zip(hull, [*hull[1:], hull[0]]):
+        if (i - last) % len(coords) > 1:
+            band[
+                np.arange(last + 1, i if last < i else i + len(coords)) % len(coords)
+            ] = _projectCoords(last, i, coords)
+    return band
+
+
+# Returns the points of the convex hull of the polygon defined by the given list.
+# method="melkman" finds the hull in linear time (the polygon has to be simple),
+# method="giftwrap" checks every vertex against the whole polygon.
+@timed()
+def getHullPoints(points: Points, method: str = "melkman") -> PointArray:
+    coords = asCoords(points)
+    n = len(coords)
+    if method == "melkman":
+        indices = _melkmanHull(coords)
+        if len(indices) >= 3:
+            indices = hullBoundaryIndices(indices, coords)
+        return PointArray(rubberBand(indices.tolist(), coords))
+    elif method != "giftwrap":
+        raise ValueError(f"Unknown hull method: {method}")
+
+    first_index = _minIndex(coords)
+    hull = [first_index]
+    last = first_index
+    i = (first_index + 1) % n
+
+    index = ExtremalIndex(points)
+    while i != first_index:
+        # The index rules out most candidates in O(log n), only the survivors
+        # are scanned to get the exact answer
+        if index.oneSided(coords[last], coords[i]):
+            sides = _sides(coords[last], coords[i], coords)
+            if not (sides.max() > 0 and sides.min() < 0):
+                hull.append(i)
+                last = i
+        i = (i + 1) % n
+    return PointArray(rubberBand(sorted(hull), coords))
+
+
+# Calculates camera scale from the polygon's size. Only the width of the polygon
+# counts unless the frame's `aspect` (width over height) is given, then its
+# height has to fit as well; see some.camera for whole flip sequences.
+def getCameraWidth(points: Points, aspect: Optional[float] = None) -> float:
+
+    multiplier = 2  # <- modify this to change scale
+
+    extent = np.ptp(asCoords(points)[:, :2], axis=0)
+    width = extent[0] if aspect is None else max(extent[0], extent[1] * aspect)
+    return float(width) * multiplier
+
+
+# Returns the total length of the polygon's edges
+def getPerimeter(points: Points) -> float:
+    coords = asCoords(points)
+    return float(np.sum(np.linalg.norm(np.roll(coords, -1, axis=0) - coords, axis=1)))
+
+
+# Returns, for every start index i, whether the chord from vertex i to vertex
+# i + c has the entire polygon on one side
+def _supportingChords(c: int, coords: np.ndarray) -> np.ndarray:
+    b = np.roll(coords, -c, axis=0)
+    result = np.empty(len(coords), dtype=bool)
+    chunk = max(1, 2**22 // max(1, len(coords)))  # bounds the side matrix size
+    for start in range(0, len(coords), chunk):
+        sides = _orientation(
+            coords[start : start + chunk, np.newaxis],
+            b[start : start + chunk, np.newaxis],
+            coords,
+        )
+        result[start : start + chunk] = ~(
+            (sides.max(axis=1) > 0) & (sides.min(axis=1) < 0)
+        )
+    return result
+
+
+# Returns the indices of the vertices of the convex hull (looking at x and y only)
+# in counterclockwise order. Collinear points on the hull's edges are left out.
+def _convexHullCycle(coords: np.ndarray) -> list[int]:
+    x, y = coords[:, 0], coords[:, 1]
+    xs, ys = x.tolist(), y.tolist()
+
+    # Akl-Toussaint: nothing strictly inside the quadrilateral spanned by the
+    # leftmost, lowest, rightmost and highest points can be on the hull
+    quad = coords[[np.argmin(x), np.argmin(y), np.argmax(x), np.argmax(y)]]
+    inside = np.ones(len(coords), dtype=bool)
+    for q1, q2 in zip(quad, np.roll(quad, -1, axis=0)):
+        left = (q2[0] - q1[0]) * (y - q1[1])
+        right = (q2[1] - q1[1]) * (x - q1[0])
+        # Keep the points whose side the rounding could have changed
+        inside &= left - right > _ORIENTATION_ERROR * (np.abs(left) + np.abs(right))
+    candidates = np.flatnonzero(~inside)
+    candidates = candidates[np.lexsort((y[candidates], x[candidates]))]
+
+    # Andrew's monotone chain
+    def chain(order: list[int]) -> list[int]:
+        result: list[int] = []
+        for i in order:
+            while len(result) >= 2:
+                o, a = result[-2], result[-1]
+                if _orient(xs[a], ys[a], xs[i], ys[i], xs[o], ys[o]) > 0:
+                    break
+                result.pop()
+            result.append(i)
+        return result
+
+    order = candidates.tolist()
+    lower = chain(order)
+    upper = chain(order[::-1])
+    return lower[:-1] + upper[:-1]
+
+
+# Returns the indices of the vertices of the convex hull (looking at x and y only),
+# sorted in polygon order. Collinear points on the hull's edges are left out.
+def convexHullIndices(coords: np.ndarray) -> np.ndarray:
+    return np.unique(_convexHullCycle(coords))
+
+
+# Returns the indices of the hull vertices of a simple polygon, sorted in polygon
+# order, using Melkman's algorithm. Collinear points on the hull's edges are
+# left out.
+def _melkmanHull(coords: np.ndarray) -> np.ndarray:
+    x, y = coords[:, 0].tolist(), coords[:, 1].tolist()
+
+    # Positive if a, b, c turn counterclockwise. The float filter of _orient
+    # is inlined, this is the hot loop.
+    def left(a: int, b: int, c: int) -> float:
+        det = (x[b] - x[a]) * (y[c] - y[a]) - (y[b] - y[a]) * (x[c] - x[a])
+        if abs(det) > _ORIENTATION_ERROR * (
+            abs((x[b] - x[a]) * (y[c] - y[a])) + abs((y[b] - y[a]) * (x[c] - x[a]))
+        ):
+            return det
+        if (x[b] == x[a] or y[c] == y[a]) and (y[b] == y[a] or x[c] == x[a]):
+            return 0.0
+        return _orient(x[b], y[b], x[c], y[c], x[a], y[a])
+
+    # Start with the first two vertices and the first one not on their line
+    vertices = iter(range(len(x)))
+    start = [next(vertices), next(vertices)]
+    for v in vertices:
+        turn = left(start[0], start[1], v)
+        if turn != 0:
+            break
+        start[1] = v  # the middle one can't be a hull vertex
+    else:
+        return np.array(start)  # flat polygon
+    if turn > 0:
+        deque = collections.deque([v, start[0], start[1], v])
+    else:
+        deque = collections.deque([v, start[1], start[0], v])
+
+    # The deque holds the hull of the vertices so far, counterclockwise, with
+    # the latest hull vertex on both ends
+    for v in vertices:
+        if left(deque[-2], deque[-1], v) > 0 and left(deque[0], deque[1], v) > 0:
+            continue  # inside
+        while left(deque[-2], deque[-1], v) <= 0:
+            deque.pop()
+        deque.append(v)
+        while left(v, deque[0], deque[1]) <= 0:
+            deque.popleft()
+        deque.appendleft(v)
+    deque.pop()
+    return np.unique(list(deque))
+
+
+# Returns the indices of every vertex on the boundary of the hull, i.e. the
+# vertices of `hull` plus the vertices that lie on one of its edges (no farther
+# than `tolerance` from the edge's line)
+def hullBoundaryIndices(
+    hull: np.ndarray, coords: np.ndarray, tolerance: float = 0.0
+) -> np.ndarray:
+    n = len(coords)
+    edge = np.searchsorted(hull, np.arange(n), side="right") - 1  # -1 wraps around
+    a = coords[hull[edge]]
+    b = coords[hull[(edge + 1) % len(hull)]]
+    cross = (a[:, 0] - b[:, 0]) * (coords[:, 1] - b[:, 1]) - (a[:, 1] - b[:, 1]) * (
+        coords[:, 0] - b[:, 0]
+    )
+    return np.flatnonzero(
+        np.abs(cross) <= tolerance * np.hypot(a[:, 0] - b[:, 0], a[:, 1] - b[:, 1])
+    )
+
+
+# Returns every (c, i) such that the chord from vertex i to vertex i + c lies on
+# the hull boundary, 2 <= c <= n / 2, sorted the same way findFlip searches them.
+# Two vertices can only have the whole polygon on one side of their chord if
+# both are on the same hull edge, so these are the only chords worth checking.
+def _hullChords(
+    coords: np.ndarray, cycle: Optional[list[int]] = None
+) -> Optional[np.ndarray]:
+    n = len(coords)
+    hull = np.unique(_convexHullCycle(coords) if cycle is None else cycle)
+    # Reflected vertices that should be on a hull edge are often off by a
+    # rounding error, so be generous here; every chord is checked exactly later
+    tolerance = 1e-9 * float(np.ptp(coords[:, :2])) if n else 0.0
+    a, b, p = coords[np.roll(hull, 1)], coords[np.roll(hull, -1)], coords[hull]
+    cross = (a[:, 0] - b[:, 0]) * (p[:, 1] - b[:, 1]) - (a[:, 1] - b[:, 1]) * (
+        p[:, 0] - b[:, 0]
+    )
+    hull = hull[
+        np.abs(cross) > tolerance * np.hypot(a[:, 0] - b[:, 0], a[:, 1] - b[:, 1])
+    ]
+    if len(hull) < 3:
+        return None  # degenerate (flat) polygon
+    h = len(hull)
+    boundary = hullBoundaryIndices(hull, coords, tolerance)
+    boundary = boundary[np.argsort((boundary - hull[0]) % n, kind="stable")]
+    edge = np.searchsorted(hull - hull[0], (boundary - hull[0]) % n, side="right") - 1
+
+    # The vertices of every hull edge, in polygon order: the edge's first hull
+    # vertex, the boundary vertices on it, and the next hull vertex
+    ends = np.searchsorted(edge, np.arange(h), side="right")
+    members = np.insert(boundary, ends, np.roll(hull, -1))
+    member_edge = np.insert(edge, ends, np.arange(h))
+
+    group_start = np.searchsorted(member_edge, member_edge, side="left")
+    group_size = np.searchsorted(member_edge, member_edge, side="right") - group_start
+    local = np.arange(len(members)) - group_start
+
+    # Pair every member with the next few members of its edge. In exact
+    # arithmetic the nearest one that skips a vertex would do, the others are
+    # there in case rounding makes that chord fail the exact check.
+    chords = []
+    for step in range(1, 4):
+        other = members[group_start + (local + step) % group_size]
+        c = (other - members) % n
+        valid = (step < group_size) & (c >= 2) & (c <= n / 2)
+        chords.append(np.stack((c[valid], members[valid]), axis=1))
+    # Also pair them with the ends of their edge, in case a longer run of
+    # vertices is collinear up to rounding
+    first = members[group_start]
+    last = members[group_start + group_size - 1]
+    for i, j in ((members, last), (first, members)):
+        c = (j - i) % n
+        valid = (c >= 2) & (c <= n / 2)
+        chords.append(np.stack((c[valid], i[valid]), axis=1))
+    return np.unique(np.concatenate(chords), axis=0)
+
+
+# Returns the (i, j) vertex indices of the next flip, or None if the polygon is
+# convex. method="hull" takes the candidate chords from the convex hull,
+# method="bruteforce" checks every chord; both pick the same flip.
+@timed()
+def searchFlip(points: Points, method: str = "hull") -> Optional[tuple[int, int]]:
+    coords = asCoords(points)
+    n = len(coords)
+    if method == "hull":
+        cycle = _convexHullCycle(coords) if n else []
+        chords = _hullChords(coords, cycle)
+        if chords is not None:
+            index = ExtremalIndex(points, cycle)
+            for c, i in chords.tolist():
+                # The index rules out most chords in O(log n), only the
+                # survivors are scanned to get the exact answer
+                if not index.oneSided(coords[i], coords[(i + c) % n]):
+                    continue
+                sides = _sides(coords[i], coords[(i + c) % n], coords)
+                if not (sides.max() > 0 and sides.min() < 0):
+                    return i, (i + c) % n
+            return None
+    elif method != "bruteforce":
+        raise ValueError(f"Unknown flip search method: {method}")
+
+    c = 2
+    while c <= n / 2:
+        supporting = np.flatnonzero(_supportingChords(c, coords))
+        if len(supporting) > 0:
+            i = int(supporting[0])
+            return i, (i + c) % n
+        c += 1
+    return None
+
+
+# Finds a flip and executes it. Returns the (i, j) indices of the flip, or None
+# if the polygon was already convex.
+@timed()
+def findFlip(points: Points, method: str = "hull") -> Optional[tuple[int, int]]:
+    found = searchFlip(points, method)
+    if found is None:
+        print("It's convex!")
+        return None
+    flip_range(*found, points)
+    return found
+
+
+# Returns the sorted indices of every vertex on the hull boundary, i.e. the hull
+# vertices getHullPoints finds
+def _hullMembers(coords: np.ndarray) -> list[int]:
+    hull = convexHullIndices(coords)
+    if len(hull) < 3:
+        return hull.tolist()
+    return hullBoundaryIndices(hull, coords).tolist()
+
+
+# Keeps the hull of a polygon (the same points getHullPoints returns) up to date
+# across flips. After the vertices between i and j have been flipped,
+# update(i, j) only recomputes the hull around the flipped pocket: the pocket
+# plus however many of the neighbouring hull vertices it swallowed.
+class IncrementalHull:
+    def __init__(self, points: Points) -> None:
+        self.points = points
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        coords = asCoords(self.points)
+        self.vertices = _hullMembers(coords)  # sorted vertex indices
+        self.band = rubberBand(self.vertices, coords)
+        area = np.sum(
+            coords[:, 0] * np.roll(coords[:, 1], -1)
+            - np.roll(coords[:, 0], -1) * coords[:, 1]
+        )
+        self.orientation = 1.0 if area >= 0 else -1.0
+
+    def hullPoints(self) -> PointArray:
+        return PointArray(self.band.copy())
+
+    # Call after the vertices strictly between i and j were flipped
+    @timed()
+    def update(self, i: int, j: int) -> None:
+        coords = asCoords(self.points)
+        n = len(coords)
+        hull = self.vertices
+        h = len(hull)
+        first_after = bisect.bisect_left(hull, j) % h if h else 0
+        inside = (first_after - bisect.bisect_right(hull, i)) % h if h else 0
+        # The old hull vertices that were not flipped, counted from j around to i
+        outside = h - inside
+
+        def outer(rank: int) -> int:
+            return hull[(first_after + rank) % h]
+
+        before = after = 1
+        while before + after + 2 <= outside:
+            window = [outer(r) for r in range(outside - before, outside)]
+            if window[-1] != i:
+                window.append(i)
+            window += [(i + d) % n for d in range(1, (j - i) % n)]
+            if outer(0) != j:
+                window.append(j)
+            window += [outer(r) for r in range(after)]
+
+            local = coords[window]
+            arc = self._outerArc(local)
+            # Grow the window on every side where the new pocket swallowed the
+            # last old hull vertex, or makes a dent with the one before it
+            grow_before = (
+                not arc
+                or self._turn(
+                    coords[outer(outside - before - 1)], local[0], local[arc[1]]
+                )
+                < 0
+            )
+            grow_after = (
+                not arc
+                or self._turn(local[arc[-2]], local[-1], coords[outer(after)]) < 0
+            )
+            if grow_before or grow_after:
+                before *= 2 if grow_before else 1
+                after *= 2 if grow_after else 1
+                continue
+
+            self._replace(
+                (first_after + outside - before) % h,
+                before + inside + after,
+                [window[a] for a in arc],
+            )
+            for last, v in zip(arc, arc[1:]):
+                self.band[window[last]] = coords[window[last]]
+                if (window[v] - window[last]) % n > 1:
+                    self.band[
+                        np.arange(
+                            window[last] + 1,
+                            window[last] + (window[v] - window[last]) % n,
+                        )
+                        % n
+                    ] = _projectCoords(window[last], window[v], coords)
+            self.band[window[-1]] = coords[window[-1]]
+            return
+        self.rebuild()  # the pocket changed most of the hull
+
+    # Returns the positions of the hull vertices of the window `local` that run
+    # from its first to its last point on the outside, plus the window points
+    # lying on those edges. Empty if the ends of the window are not on its hull.
+    def _outerArc(self, local: np.ndarray) -> list[int]:
+        cycle = _convexHullCycle(local)
+        if self.orientation < 0:
+            cycle.reverse()
+        if len(cycle) < 3 or 0 not in cycle or len(local) - 1 not in cycle:
+            return []
+        start = cycle.index(0)
+        cycle = cycle[start:] + cycle[:start]
+        path = cycle[: cycle.index(len(local) - 1) + 1]
+        if path != sorted(path):
+            return []
+        return hullBoundaryIndices(np.array(path), local).tolist()
+
+    def _turn(self, p: np.ndarray, c: np.ndarray, q: np.ndarray) -> float:
+        return self.orientation * (
+            (c[0] - p[0]) * (q[1] - c[1]) - (c[1] - p[1]) * (q[0] - c[0])
+        )
+
+    # Replaces `count` hull vertices, starting at position `start` of the
+    # (cyclic) hull vertex list, with `vertices`
+    def _replace(self, start: int, count: int, vertices: list[int]) -> None:
+        hull = self.vertices
+        if start + count <= len(hull):
+            hull[start : start + count] = vertices
+            return
+        wrap = next(
+            (k for k in range(1, len(vertices)) if vertices[k] < vertices[k - 1]),
+            len(vertices),
+        )
+        self.vertices = (
+            vertices[wrap:]
+            + hull[(start + count) % len(hull) : start]
+            + vertices[:wrap]
+        )
+
+
+# Finds the midpoint of the line segment defind by a and b points
+def findMidPoint(a: Point, b: Point) -> Point:
+    return Point((a.x + b.x) / 2, (a.y + b.y) / 2, (a.z + b.z) / 2)
+
+
+# Projects p onto the line through the midpoints of its edges to a and b. The
+# distance between p and its projection is p's radius in the convexity
+# tolerance: how far the three vertices can move before the corner at p flips.
+def midpointChordProjection(a: Point, p: Point, b: Point) -> Point:
+    m1 = findMidPoint(a, p)
+    m2 = findMidPoint(b, p)
+    v1 = Point(m1.x - m2.x, m1.y - m2.y, m1.z - m2.z)
+    v1Length = math.sqrt(v1.x**2 + v1.y**2 + v1.z**2)
+    v2 = Point(p.x - m2.x, p.y - m2.y, 0)
+    dotProduct = v1.x * v2.x + v1.y * v2.y + v1.z * v2.z
+    return Point(*[x * dotProduct / (v1Length**2) + y for x, y in zip(v1, m2)])
+
+
+# Returns the convexity tolerance radius of every vertex (see
+# midpointChordProjection), negative for reflex vertices. A reflex vertex with
+# radius -r can be made flat by moving it and its neighbours by r.
+def vertexTolerances(points: Points) -> np.ndarray:
+    coords = asCoords(points)
+    previous = np.roll(coords, 1, axis=0)
+    following = np.roll(coords, -1, axis=0)
+
+    # midpointChordProjection for every vertex at once
+    m1 = (previous + coords) / 2
+    m2 = (following + coords) / 2
+    v1 = m1 - m2
+    v1Length = np.sqrt(np.sum(v1**2, axis=1))
+    dotProduct = v1[:, 0] * (coords[:, 0] - m2[:, 0]) + v1[:, 1] * (
+        coords[:, 1] - m2[:, 1]
+    )
+    projected = v1 * dotProduct[:, np.newaxis] / (v1Length**2)[:, np.newaxis] + m2
+    radius = np.sqrt(np.sum((coords - projected) ** 2, axis=1))
+
+    area = np.sum(coords[:, 0] * following[:, 1] - following[:, 0] * coords[:, 1])
+    turn = _orientation(coords, previous, following)
+    return radius * (turn if area >= 0 else -turn)
+
+
+# Returns the convexity tolerance of the polygon (the epsilon of the Eduard
+# section), the smallest radius of any vertex, and the index of that vertex
+@timed()
+def convexity_tolerance(points: Points) -> tuple[float, int]:
+    radius = np.abs(vertexTolerances(points))
+    i = int(np.argmin(radius))
+    return float(radius[i]), i
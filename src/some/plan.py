@@ -0,0 +1,294 @@
+# The render plan of the video: for every section of the scene the geometry it
+# shows, the camera frames it moves between and its other parameters. Building
+# it only needs NumPy, and it can be written to JSON. Each section's content
+# hash covers everything that section's movie depends on, so unchanged sections
+# can be reused between renders. Every section starts from what the one before
+# it left on screen, so its hash covers that section's hash too.
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import numpy as np
+
+from some.cache import FlipCache
+from some.camera import cameraPath
+from some.convexify import convexifySteps
+from some.geometry import (
+    PointArray,
+    asCoords,
+    convexity_tolerance,
+    flip_range,
+    getCameraWidth,
+    getHullPoints,
+)
+from some.timing import timed
+from some.wiggle import wiggle
+
+FRANK: list[list[float]] = [
+    [1, 3, 0],
+    [0, 2, 0],
+    [0, 0, 0],
+    [-3, 0, 0],
+    [-1, -1, 0],
+    [0, -3, 0],
+    [1, -1, 0],
+    [4, 0, 0],
+    [2, 1, 0],
+]
+CONVEX_FRANK: list[list[float]] = [
+    [1, 3, 0],
+    [0, 3, 0],
+    [-2, 1.5, 0],
+    [-3, 0, 0],
+    [-2.5, -2, 0],
+    [0, -3, 0],
+    [3.5, -3, 0],
+    [4, 0, 0],
+    [3, 2.5, 0],
+]
+FRANK_2: list[list[float]] = [
+    [0, 4, 0],
+    [-1, 0, 0],
+    [-1, 2, 0],
+    [-2, 3, 0],
+    [-3, 1, 0],
+    [-1, -1, 0],
+    [-5, -1, 0],
+    [-3, -2, 0],
+    [2, 0, 0],
+    [0, 1, 0],
+]
+FRANK_2_EXTENDED: list[list[float]] = [
+    [-3.224768843, 0.305669231, 0],
+    [-7.3477603878, 0.3363404141, 0],
+    [-9.3469458029, 0.3934164889, 0],
+    [-10.7600924158, 0.3384924263, 0],
+    [-12.4281440321, 0.059216225, 0],
+    [-9.6133959371, -0.2186203491, 0],
+    [-5.6142604062, -0.3017768587, 0],
+    [-3.3784287974, -0.2692650573, 0],
+    [2, 0, 0],
+    [-0.2263518348, 0.2082246565, 0],
+]
+EDUARD: list[list[float]] = [
+    # [1, 3, 0],
+    [0, 3, 0],
+    [-2, 1.5, 0],
+    [-3, 0, 0],
+    [-2.5, -2, 0],
+    [0, -3, 0],
+    [3.5, -3, 0],
+    [4, 0, 0],
+    [3, 2.5, 0],
+]
+TOLERANCE_DOTS: list[list[float]] = [[-3, 0, 0], [0, 1, 0], [3, -1, 0]]
+
+WIGGLE_SEED = 3141592
+
+DEFAULT_CAMERA = [0.0, 0.0, 128 / 9]  # x, y and width of manim's default frame
+
+
+# One section of the video. `states` holds named polygons, (n, 3) arrays, named
+# flip sequences, (flips, n, 3) arrays, and camera paths along flip sequences,
+# (flips, 3) arrays of frames. `cameras` holds named [x, y, width] frames;
+# "entry" is where the camera is when the section starts and "exit" where it is
+# left.
+@dataclass
+class SectionPlan:
+    name: str
+    states: dict[str, np.ndarray] = field(default_factory=dict)
+    cameras: dict[str, list[float]] = field(default_factory=dict)
+    parameters: dict[str, Any] = field(default_factory=dict)
+
+    def points(self, name: str) -> PointArray:
+        return PointArray(self.states[name])
+
+    def toDict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "states": {k: v.tolist() for k, v in self.states.items()},
+            "cameras": self.cameras,
+            "parameters": self.parameters,
+        }
+
+    @staticmethod
+    def fromDict(data: dict[str, Any]) -> "SectionPlan":
+        return SectionPlan(
+            data["name"],
+            {k: np.array(v, dtype=np.float64) for k, v in data["states"].items()},
+            data["cameras"],
+            data["parameters"],
+        )
+
+
+@dataclass
+class RenderPlan:
+    sections: list[SectionPlan]
+
+    def section(self, name: str) -> SectionPlan:
+        for section in self.sections:
+            if section.name == name:
+                return section
+        raise KeyError(name)
+
+    # Returns the content hash of every section. `salts` can add more inputs per
+    # section (e.g. the code that renders it); a section's hash also covers the
+    # hash of the section before it.
+    def hashes(self, salts: Optional[dict[str, str]] = None) -> dict[str, str]:
+        result: dict[str, str] = {}
+        previous = ""
+        for section in self.sections:
+            content = {
+                "section": section.toDict(),
+                "salt": (salts or {}).get(section.name, ""),
+                "previous": previous,
+            }
+            text = json.dumps(content, sort_keys=True)
+            result[section.name] = previous = hashlib.sha256(text.encode()).hexdigest()
+        return result
+
+    def toJson(self) -> str:
+        return json.dumps([s.toDict() for s in self.sections], indent=2)
+
+    @staticmethod
+    def fromJson(text: str) -> "RenderPlan":
+        return RenderPlan([SectionPlan.fromDict(data) for data in json.loads(text)])
+
+
+# Returns the camera frame that shows the whole polygon, like
+# camera.frame.move_to(polygon).set(width=getCameraWidth(...))
+def _frame(points: PointArray, width_of: Optional[PointArray] = None) -> list[float]:
+    coords = asCoords(points)
+    center = (coords.min(axis=0) + coords.max(axis=0)) / 2
+    width = getCameraWidth(width_of if width_of is not None else points)
+    return [float(center[0]), float(center[1]), width]
+
+
+@timed()
+def buildRenderPlan(cache: Optional[FlipCache] = None) -> RenderPlan:
+    frank = PointArray(FRANK)
+    flipped_frank = frank.copy()
+    flip_range(7, 0, flipped_frank)
+    killed_frank = flipped_frank.copy()
+    flip_range(0, 4, killed_frank)
+
+    frank_2 = PointArray(FRANK_2)
+    steps = list(convexifySteps(frank_2, hull=True, cache=cache))
+    flipped_frank_2 = frank_2.copy()
+    flip_range(8, 0, flipped_frank_2)
+    convex_frank_2 = steps[-1].points  # convexified once, for all sections
+    overview = [-3.8, 2.2, 22.0]
+    approached = steps[-1].points.coords[4]
+    step_states = np.array([step.points.coords for step in steps])
+    step_hulls = []
+    for step in steps:
+        assert step.hull is not None  # asked for with hull=True
+        step_hulls.append(step.hull.coords)
+    camera_path = cameraPath(step_states, start=overview)  # leaving the overview
+    # The Monte-Carlo trials the tolerance and Eduard sections show, drawn here
+    # so that they are hashed with the rest of the plan
+    dots, tolerance = PointArray(TOLERANCE_DOTS), 0.7397954428741
+    eduard = PointArray(EDUARD)
+    eduard_tolerance, _ = convexity_tolerance(eduard)
+
+    sections = [
+        SectionPlan("title"),
+        SectionPlan(
+            "frank",
+            {"frank": frank.coords, "convex_frank": PointArray(CONVEX_FRANK).coords},
+        ),
+        SectionPlan(
+            "flip_demo",
+            {
+                "frank": frank.coords,
+                "flipped": flipped_frank.coords,
+                "killed": killed_frank.coords,
+            },
+            {
+                "flip": [2.5, 1.5, 10.0],
+                "center": DEFAULT_CAMERA,
+                "exit": DEFAULT_CAMERA,
+            },
+        ),
+        SectionPlan(
+            "convexify",
+            {
+                "frank_2": frank_2.coords,
+                "hull": getHullPoints(frank_2).coords,
+                "steps": step_states,
+                "camera_path": camera_path,
+                "step_hulls": np.array(step_hulls),
+            },
+            {"frank_2": _frame(frank_2), "overview": overview, "exit": _frame(frank_2)},
+        ),
+        SectionPlan(
+            "perimeter",
+            {"frank_2": frank_2.coords, "flipped": flipped_frank_2.coords},
+        ),
+        SectionPlan(
+            "distance",
+            {
+                "frank_2": frank_2.coords,
+                "flipped": flipped_frank_2.coords,
+                "extended": PointArray(FRANK_2_EXTENDED).coords,
+            },
+            {"extended": [-4.8, 0.2, 18.0], "exit": [-4.8, 0.2, 18.0]},
+            {"inner_point": [1, 0, 0], "intersect_point": [1.56, 0.88, 0]},
+        ),
+        SectionPlan(
+            "limit",
+            {"frank_2": frank_2.coords, "convex": convex_frank_2.coords},
+            {
+                "overview": [0.8, 0.2, 32.0],
+                "frank_2": _frame(frank_2, convex_frank_2),
+                "exit": _frame(frank_2, convex_frank_2),
+            },
+            {"dots": [[0, 0, 0], [-2, 1, 0], [-3, -1.5, 0]], "delta": 1},
+        ),
+        SectionPlan(
+            "tolerance",
+            {
+                "dots": dots.coords,
+                "wiggles": wiggle(dots, tolerance, 8, WIGGLE_SEED, "radius"),
+            },
+            {"center": DEFAULT_CAMERA, "exit": DEFAULT_CAMERA},
+            {"epsilon": tolerance},
+        ),
+        SectionPlan(
+            "eduard",
+            {
+                "eduard": eduard.coords,
+                "wiggles": wiggle(eduard, eduard_tolerance, 7, WIGGLE_SEED, "circle"),
+            },
+        ),
+        SectionPlan(
+            "proof",
+            {
+                "frank_2": frank_2.coords,
+                "steps": step_states,
+                "camera_path": camera_path,
+            },
+            {
+                "frank_2": _frame(frank_2),
+                "start": [
+                    float(frank_2.coords[4, 0]),
+                    float(frank_2.coords[4, 1]),
+                    8.0,
+                ],
+                "overview": overview,
+                "approached": [float(approached[0]), float(approached[1]), 5.0],
+                "exit": overview,
+            },
+            {"approached": approached.tolist()},
+        ),
+    ]
+
+    # Every section starts where the previous one left the camera
+    camera = DEFAULT_CAMERA
+    for section in sections:
+        section.cameras = {"entry": camera, **section.cameras}
+        camera = section.cameras.get("exit", camera)
+        section.cameras["exit"] = camera
+    return RenderPlan(sections)
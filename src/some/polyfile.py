@@ -0,0 +1,174 @@
+# Compact binary files for polygons and flip sequences. A file is a 40 byte
+# header (magic, version, flags and three counts) followed by little-endian
+# int64 index arrays and float64 vertex arrays, all 8 byte aligned, so loading
+# one memory-maps the arrays instead of parsing anything:
+#
+#   polygon file  header(b"SOMEPOLY", polygons, vertices)
+#                 offsets   (polygons + 1,) <i8, polygon k is
+#                 vertices  (vertices, 3)   <f8  vertices[offsets[k]:offsets[k+1]]
+#
+#   flip file     header(b"SOMEFLIP", n, flips, pocket vertices)
+#                 polygon   (n, 3)               <f8 before the first flip
+#                 events    (flips, 4)           <i8 pivot i, pivot j, start, count
+#                 pockets   (pocket vertices, 3) <f8 every flip's pocket in order
+#
+# A flip file with the COMPLETE flag holds the whole sequence, the polygon is
+# convex after its last flip; without it, only the start of the sequence.
+
+import os
+import struct
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Sequence, Union, overload
+
+import numpy as np
+
+from some.convexify import FlipDelta
+from some.geometry import PointArray, Points
+
+POLYGON_MAGIC = b"SOMEPOLY"
+FLIPS_MAGIC = b"SOMEFLIP"
+FORMAT_VERSION = 1
+
+# magic, version, flags, and three counts
+_HEADER = struct.Struct("<8sIIQQQ")
+
+COMPLETE = 1
+
+PathLike = Union[str, Path]
+
+
+def _writeHeader(f: BinaryIO, magic: bytes, flags: int, *counts: int) -> None:
+    f.write(_HEADER.pack(magic, FORMAT_VERSION, flags, *counts))
+
+
+# Returns the flags and the three counts
+def _readHeader(path: PathLike, magic: bytes) -> tuple[int, int, int, int]:
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise ValueError(f"{path} is too short for a polygon or flip file")
+    found, version, flags, *counts = _HEADER.unpack(header)
+    if found != magic:
+        raise ValueError(f"{path} is not a {magic.decode()} file")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"{path} has format version {version}, not {FORMAT_VERSION}")
+    return flags, counts[0], counts[1], counts[2]
+
+
+# Maps `shape` items of `dtype` at `offset` read-only. NumPy can't map nothing,
+# so empty arrays are plain ones.
+def _map(path: PathLike, dtype: str, offset: int, shape: tuple[int, ...]) -> np.ndarray:
+    if 0 in shape:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+
+
+def _check(path: PathLike, size: int) -> None:
+    if os.path.getsize(path) < size:
+        raise ValueError(f"{path} is truncated")
+
+
+# Writes the polygons into one polygon file
+def writePolygons(path: PathLike, polygons: Iterable[Points]) -> None:
+    arrays = [PointArray(polygon).coords for polygon in polygons]
+    offsets = np.cumsum([0] + [len(a) for a in arrays], dtype="<i8")
+    with open(path, "wb") as f:
+        _writeHeader(f, POLYGON_MAGIC, 0, len(arrays), int(offsets[-1]), 0)
+        f.write(offsets.tobytes())
+        for coords in arrays:
+            f.write(np.ascontiguousarray(coords, dtype="<f8").tobytes())
+
+
+# A polygon file, memory-mapped. Indexing it gives PointArrays that are views
+# into the read-only map, so nothing is read before it's used; copy a polygon
+# (convexify does) before changing it.
+class PolygonFile(Sequence[PointArray]):
+    def __init__(self, path: PathLike) -> None:
+        _, polygons, vertices, _ = _readHeader(path, POLYGON_MAGIC)
+        start = _HEADER.size + 8 * (polygons + 1)
+        _check(path, start + 24 * vertices)
+        self.path = Path(path)
+        self.offsets = _map(path, "<i8", _HEADER.size, (polygons + 1,))
+        self.coords = _map(path, "<f8", start, (vertices, 3))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @overload
+    def __getitem__(self, k: int) -> PointArray:
+        pass
+
+    @overload
+    def __getitem__(self, k: slice) -> list[PointArray]:
+        pass
+
+    def __getitem__(self, k: Union[int, slice]) -> Union[PointArray, list[PointArray]]:
+        if isinstance(k, slice):
+            return [self[i] for i in range(*k.indices(len(self)))]
+        if k < -len(self) or k >= len(self):
+            raise IndexError("PolygonFile index out of range")
+        k %= len(self)
+        return PointArray.wrap(self.coords[self.offsets[k] : self.offsets[k + 1]])
+
+    def __iter__(self) -> Iterator[PointArray]:
+        return (self[k] for k in range(len(self)))
+
+
+# Writes a polygon and its flip sequence (see flipDeltas) into one flip file.
+# Pass complete=True if the polygon is convex after the last of them.
+def writeFlips(
+    path: PathLike,
+    points: Points,
+    deltas: Sequence[FlipDelta],
+    complete: bool = False,
+) -> None:
+    coords = np.ascontiguousarray(PointArray(points).coords, dtype="<f8")
+    events = np.array(
+        [(*d.pivots, d.start, d.count) for d in deltas], dtype="<i8"
+    ).reshape(-1, 4)
+    with open(path, "wb") as f:
+        _writeHeader(
+            f,
+            FLIPS_MAGIC,
+            COMPLETE if complete else 0,
+            len(coords),
+            len(events),
+            int(events[:, 3].sum()),
+        )
+        f.write(coords.tobytes())
+        f.write(events.tobytes())
+        for d in deltas:
+            f.write(np.ascontiguousarray(d.coords, dtype="<f8").tobytes())
+
+
+# A flip file, memory-mapped. The flip deltas' coordinates are views into the
+# map, so even long flip histories load without reading the pockets.
+class FlipFile:
+    def __init__(self, path: PathLike) -> None:
+        flags, n, flips, vertices = _readHeader(path, FLIPS_MAGIC)
+        events_start = _HEADER.size + 24 * n
+        pockets_start = events_start + 32 * flips
+        _check(path, pockets_start + 24 * vertices)
+        self.path = Path(path)
+        self.complete = bool(flags & COMPLETE)  # whether it ends convex
+        self.polygon = _map(path, "<f8", _HEADER.size, (n, 3))
+        self.events = _map(path, "<i8", events_start, (flips, 4))
+        self.pockets = _map(path, "<f8", pockets_start, (vertices, 3))
+        self.ends = np.cumsum(self.events[:, 3])
+        if self.ends.size and self.ends[-1] != vertices:
+            raise ValueError(f"{path} has inconsistent pocket sizes")
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    # The polygon before the first flip
+    def points(self) -> PointArray:
+        return PointArray.wrap(self.polygon)
+
+    def delta(self, k: int) -> FlipDelta:
+        i, j, start, count = self.events[k].tolist()
+        end = int(self.ends[k])
+        return FlipDelta(k + 1, (i, j), start, count, self.pockets[end - count : end])
+
+    def deltas(self) -> list[FlipDelta]:
+        return [self.delta(k) for k in range(len(self))]
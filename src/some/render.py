@@ -0,0 +1,72 @@
+# Helpers for putting the video together from per-section movies: a cache of
+# finished sections by content hash, lossless concatenation with ffmpeg, and
+# how many sections to render at once.
+
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Optional, Sequence
+
+from some.timing import timed
+
+JOBS_VARIABLE = "SOME_RENDER_JOBS"
+
+
+# How many sections to render in parallel: SOME_RENDER_JOBS, or one per core
+def renderJobs() -> int:
+    value = os.environ.get(JOBS_VARIABLE)
+    return max(1, int(value)) if value else os.cpu_count() or 1
+
+
+# Joins movies with identical encoding settings into one, without re-encoding
+@timed()
+def concatMovies(movies: Sequence[Path], output: Path, ffmpeg: str = "ffmpeg") -> None:
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+        for movie in movies:
+            f.write(f"file 'file:{Path(movie).resolve().as_posix()}'\n")
+    try:
+        subprocess.run(
+            [
+                ffmpeg,
+                "-y",
+                "-loglevel",
+                "error",
+                "-f",
+                "concat",
+                "-safe",
+                "0",
+                "-i",
+                f.name,
+                "-c",
+                "copy",
+                "-nostdin",
+                str(output),
+            ],
+            check=True,
+        )
+    finally:
+        os.remove(f.name)
+
+
+# A directory of section movies named after their content hash
+class SectionCache:
+    def __init__(self, directory: Path, extension: str = ".mp4") -> None:
+        self.directory = Path(directory)
+        self.extension = extension
+
+    def path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.extension}"
+
+    def get(self, key: str) -> Optional[Path]:
+        path = self.path(key)
+        return path if path.exists() else None
+
+    # Stores the movies, joined, as the section with the given key
+    def put(self, key: str, movies: Sequence[Path], ffmpeg: str = "ffmpeg") -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path(key)
+        partial = path.with_name(f"{key}.partial{self.extension}")
+        concatMovies(movies, partial, ffmpeg)
+        partial.replace(path)  # never leave a half-written section behind
+        return path
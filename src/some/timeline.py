@@ -0,0 +1,153 @@
+# The timeline of a dry run of the scene: every play call with the section it
+# belongs to, its animations, the camera frame and the outlines on screen after
+# it. It can be written as JSON and drawn as an SVG contact sheet of key frames,
+# so the layout can be checked without rendering a single frame.
+
+import html
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Sequence
+
+
+# The outline of one mobject, in scene coordinates
+@dataclass
+class Shape:
+    kind: str  # the mobject's class
+    points: list[list[float]]  # (x, y) corners of the outline
+    closed: bool
+    stroke: str  # hex colours
+    fill: str
+    stroke_opacity: float
+    fill_opacity: float
+
+
+# The state after one play (or wait) call
+@dataclass
+class Frame:
+    section: str
+    index: int  # how many play calls came before it, in all sections
+    time: float  # when the call starts, in seconds of video
+    duration: float
+    animations: list[str]  # class names
+    camera: list[float]  # x, y, width and height of the camera frame
+    shapes: list[Shape] = field(default_factory=list)
+
+    @staticmethod
+    def fromDict(data: dict[str, Any]) -> "Frame":
+        shapes = [Shape(**shape) for shape in data["shapes"]]
+        return Frame(**{**data, "shapes": shapes})
+
+
+@dataclass
+class Timeline:
+    frames: list[Frame] = field(default_factory=list)
+
+    # Start, duration and number of play calls of every section, in order
+    def sections(self) -> list[dict[str, Any]]:
+        sections: dict[str, dict[str, Any]] = {}
+        for frame in self.frames:
+            section = sections.setdefault(
+                frame.section,
+                {
+                    "name": frame.section,
+                    "start": frame.time,
+                    "duration": 0.0,
+                    "plays": 0,
+                },
+            )
+            section["duration"] = frame.time + frame.duration - section["start"]
+            section["plays"] += 1
+        return list(sections.values())
+
+    def toJson(self) -> str:
+        return json.dumps(
+            {
+                "duration": sum(frame.duration for frame in self.frames),
+                "sections": self.sections(),
+                "frames": [asdict(frame) for frame in self.frames],
+            }
+        )
+
+    @staticmethod
+    def fromJson(text: str) -> "Timeline":
+        return Timeline([Frame.fromDict(frame) for frame in json.loads(text)["frames"]])
+
+    # Writes timeline.json and contact_sheet.svg into the directory
+    def write(self, directory: Path) -> tuple[Path, Path]:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        timeline, sheet = directory / "timeline.json", directory / "contact_sheet.svg"
+        timeline.write_text(self.toJson() + "\n")
+        sheet.write_text(contactSheet(keyFrames(self.frames)))
+        return timeline, sheet
+
+
+# Picks about `limit` frames to show: the last frame of every section, and
+# evenly spaced ones to fill up the rest
+def keyFrames(frames: Sequence[Frame], limit: int = 48) -> list[Frame]:
+    if len(frames) <= limit:
+        return list(frames)
+    chosen = {
+        k
+        for k in range(len(frames))
+        if k + 1 == len(frames) or frames[k + 1].section != frames[k].section
+    }
+    rest = limit - len(chosen)
+    if rest > 1:
+        chosen |= {round(i * (len(frames) - 1) / (rest - 1)) for i in range(rest)}
+    return [frames[k] for k in sorted(chosen)]
+
+
+def _polyline(shape: Shape) -> str:
+    points = " ".join(f"{x:.3f},{-y:.3f}" for x, y in shape.points)
+    fill = shape.fill if shape.closed and shape.fill_opacity > 0 else "none"
+    return (
+        f'<{"polygon" if shape.closed else "polyline"} points="{points}" '
+        f'fill="{fill}" fill-opacity="{shape.fill_opacity:.3g}" '
+        f'stroke="{shape.stroke}" stroke-opacity="{shape.stroke_opacity:.3g}" '
+        'stroke-width="1" vector-effect="non-scaling-stroke"/>'
+    )
+
+
+# Draws the frames as a grid of camera views, `columns` wide and `width` pixels
+# per view, each captioned with its section, number and animations
+def contactSheet(
+    frames: Sequence[Frame],
+    columns: int = 4,
+    width: int = 320,
+    background: str = "#000",
+) -> str:
+    aspect = frames[0].camera[3] / frames[0].camera[2] if frames else 9 / 16
+    height = round(width * aspect)
+    caption = 32
+    rows = -(-len(frames) // columns)
+    parts = [
+        '<svg xmlns="http://www.w3.org/2000/svg" '
+        f'width="{columns * width}" height="{rows * (height + caption)}" '
+        'font-family="sans-serif" font-size="11">'
+    ]
+    for k, frame in enumerate(frames):
+        left, top = (k % columns) * width, (k // columns) * (height + caption)
+        x, y, camera_width, camera_height = frame.camera
+        view = (
+            f"{x - camera_width / 2:.3f} {-y - camera_height / 2:.3f} "
+            f"{camera_width:.3f} {camera_height:.3f}"
+        )
+        parts.append(
+            f'<rect x="{left}" y="{top}" width="{width}" height="{height}" '
+            f'fill="{background}"/>'
+        )
+        parts.append(
+            f'<svg x="{left}" y="{top}" width="{width}" height="{height}" '
+            f'viewBox="{view}" preserveAspectRatio="none">'
+        )
+        parts.extend(_polyline(shape) for shape in frame.shapes if shape.points)
+        parts.append("</svg>")
+        label = html.escape(
+            f"{frame.section} #{frame.index} {frame.time:.1f}s "
+            + ", ".join(frame.animations)
+        )
+        parts.append(f'<text x="{left + 4}" y="{top + height + 14}">{label}</text>')
+    parts.append("</svg>")
+    return "\n".join(parts) + "\n"
@@ -0,0 +1,153 @@
+# Optional timing of the render pipeline. With the environment variable
+# SOME_PROFILE set to a path prefix, every timed function and `timer` block is
+# recorded as a span, and at exit the spans are written to
+#
+#   <prefix>.json    per-name totals and every span, in seconds
+#   <prefix>.folded  collapsed stacks in microseconds, for flamegraph.pl,
+#                    speedscope or inferno
+#
+# Without it, `timed` returns the function itself and `timer` a shared no-op
+# context, so the hooks cost nothing.
+
+import atexit
+import functools
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, ContextManager, Iterator, Optional, TypeVar
+
+ENVIRONMENT_VARIABLE = "SOME_PROFILE"
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass
+class Span:
+    stack: tuple[str, ...]  # the names of the enclosing spans and this one
+    start: float  # seconds since the profiler started
+    duration: float  # seconds
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+        self._stack: list[str] = []
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        self._stack.append(name)
+        stack = tuple(self._stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._stack.pop()
+            self.spans.append(Span(stack, start - self._origin, end - start))
+
+    # The time spent in every span without the time spent in the spans inside it
+    def selfTimes(self) -> list[float]:
+        children: dict[tuple[str, ...], float] = {}
+        times = []
+        # Spans are appended as they end, so the ones inside a span come first
+        for span in self.spans:
+            inner = children.pop(span.stack, 0.0)
+            times.append(span.duration - inner)
+            parent = span.stack[:-1]
+            if parent:
+                children[parent] = children.get(parent, 0.0) + span.duration
+        return times
+
+    # Calls, total and self time per span name. Recursive spans count their
+    # total time once, at the outermost one.
+    def summary(self) -> dict[str, dict[str, float]]:
+        result: dict[str, dict[str, float]] = {}
+        for span, own in zip(self.spans, self.selfTimes()):
+            name = span.stack[-1]
+            entry = result.setdefault(name, {"calls": 0, "total": 0.0, "self": 0.0})
+            entry["calls"] += 1
+            entry["self"] += own
+            if name not in span.stack[:-1]:
+                entry["total"] += span.duration
+        return dict(sorted(result.items(), key=lambda item: -item[1]["total"]))
+
+    def toJson(self) -> str:
+        return json.dumps(
+            {
+                "summary": self.summary(),
+                "spans": [
+                    {
+                        "stack": list(span.stack),
+                        "start": span.start,
+                        "duration": span.duration,
+                    }
+                    for span in self.spans
+                ],
+            },
+            indent=2,
+        )
+
+    # Self time per stack, one "outer;inner microseconds" line each
+    def folded(self) -> list[str]:
+        stacks: dict[tuple[str, ...], float] = {}
+        for span, own in zip(self.spans, self.selfTimes()):
+            stacks[span.stack] = stacks.get(span.stack, 0.0) + own
+        return [
+            f"{';'.join(name.replace(';', ',') for name in stack)} {round(own * 1e6)}"
+            for stack, own in stacks.items()
+        ]
+
+    def write(self, prefix: str) -> None:
+        base = Path(prefix)
+        base.parent.mkdir(parents=True, exist_ok=True)
+        base.with_name(base.name + ".json").write_text(self.toJson() + "\n")
+        base.with_name(base.name + ".folded").write_text(
+            "".join(line + "\n" for line in self.folded())
+        )
+
+
+_output = os.environ.get(ENVIRONMENT_VARIABLE)
+profiler: Optional[Profiler] = Profiler() if _output else None
+if profiler is not None:
+    atexit.register(profiler.write, str(_output))
+
+_NOTHING: ContextManager[None] = nullcontext()
+
+
+# Times the block as a span with the given name, if profiling is on
+def timer(name: str) -> ContextManager[None]:
+    if profiler is None:
+        return _NOTHING
+    return profiler.span(name)
+
+
+# Times every call of the decorated function, named after it by default
+def timed(name: Optional[str] = None) -> Callable[[F], F]:
+    def decorate(function: F) -> F:
+        if profiler is None:
+            return function
+        span = profiler.span
+        label = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(label):
+                return function(*args, **kwargs)
+
+        return wrapper  # type: ignore
+
+    return decorate
+
+
+# Times every call of a method of someone else's class, like timed, if profiling
+# is on
+def instrument(owner: type, attribute: str, name: Optional[str] = None) -> None:
+    if profiler is not None:
+        method = getattr(owner, attribute)
+        setattr(
+            owner, attribute, timed(name or f"{owner.__name__}.{attribute}")(method)
+        )
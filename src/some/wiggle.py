@@ -0,0 +1,134 @@
+# Monte-Carlo experiments on the convexity tolerance: every vertex of a polygon
+# is moved by a random offset of at most epsilon, many times over, and all the
+# wiggled polygons are checked for convexity at once.
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from some.geometry import PointArray, Points
+from some.timing import timed
+
+# How the offset of a vertex is drawn from the epsilon disc around it
+DISTRIBUTIONS = {
+    "disc": "uniformly over the disc",
+    "radius": "uniform angle and uniform distance, like the tolerance section",
+    "circle": "uniform angle at exactly epsilon, like the Eduard section",
+}
+
+
+# Returns random (x, y) offsets of at most epsilon, an array of shape + (2,)
+def wiggleOffsets(
+    rng: np.random.Generator,
+    shape: tuple[int, ...],
+    epsilon: float,
+    distribution: str = "disc",
+) -> np.ndarray:
+    angle = rng.random(shape) * 2 * np.pi
+    if distribution == "disc":
+        length = np.sqrt(rng.random(shape))
+    elif distribution == "radius":
+        length = rng.random(shape)
+    elif distribution == "circle":
+        length = np.ones(shape)
+    else:
+        raise ValueError(f"Unknown wiggle distribution: {distribution}")
+    length *= epsilon
+    return np.stack((length * np.cos(angle), length * np.sin(angle)), axis=-1)
+
+
+# Returns `trials` wiggled copies of the polygon, a (trials, n, 3) array
+def wiggle(
+    points: Points,
+    epsilon: float,
+    trials: int,
+    seed: Optional[int] = None,
+    distribution: str = "disc",
+) -> np.ndarray:
+    coords = PointArray(points).coords
+    rng = np.random.default_rng(seed)
+    result = np.repeat(coords[np.newaxis], trials, axis=0)
+    result[..., :2] += wiggleOffsets(rng, (trials, len(coords)), epsilon, distribution)
+    return result
+
+
+# Returns the angle at every vertex between its two edges, in degrees, like the
+# tolerance section shows it. `coords` is an (..., n, 3) array; for an open
+# polyline (closed=False) only the n - 2 inner vertices have an angle.
+def vertexAngles(coords: np.ndarray, closed: bool = True) -> np.ndarray:
+    previous, following = np.roll(coords, 1, axis=-2), np.roll(coords, -1, axis=-2)
+    if not closed:
+        coords, previous, following = (
+            coords[..., 1:-1, :],
+            previous[..., 1:-1, :],
+            following[..., 1:-1, :],
+        )
+    u = previous[..., :2] - coords[..., :2]
+    v = following[..., :2] - coords[..., :2]
+    cosine = np.sum(u * v, axis=-1) / (
+        np.linalg.norm(u, axis=-1) * np.linalg.norm(v, axis=-1)
+    )
+    return np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+
+
+# Returns whether every polygon in the (..., n, 3) array is convex: it turns
+# the same way at every vertex (or goes straight on) and winds around once.
+# With closed=False the coordinates are open polylines that only need to turn
+# one way.
+def isConvex(coords: np.ndarray, closed: bool = True) -> np.ndarray:
+    edges = np.roll(coords[..., :2], -1, axis=-2) - coords[..., :2]
+    incoming = np.roll(edges, 1, axis=-2)
+    if not closed:
+        edges, incoming = edges[..., 1:-1, :], incoming[..., 1:-1, :]
+    cross = incoming[..., 0] * edges[..., 1] - incoming[..., 1] * edges[..., 0]
+    one_way = ~((cross > 0).any(axis=-1) & (cross < 0).any(axis=-1))
+    if not closed:
+        return one_way
+    dot = np.sum(incoming * edges, axis=-1)
+    turning = np.sum(np.arctan2(cross, dot), axis=-1)
+    return one_way & (np.abs(turning) < 3 * np.pi)  # 2 pi, up to rounding
+
+
+@dataclass
+class WiggleStats:
+    trials: int
+    convex: int  # how many wiggled polygons stayed convex
+    min_angle: float  # the smallest vertex angle in any trial, in degrees
+    max_angle: float  # the largest vertex angle in any trial, in degrees
+
+    @property
+    def convexFraction(self) -> float:
+        return self.convex / self.trials if self.trials else 1.0
+
+
+# Wiggles the polygon `trials` times and collects statistics over all of them.
+# The trials are drawn in chunks of about `chunk_vertices` vertices to bound
+# the memory use; the same seed and chunk size give the same result.
+@timed()
+def wiggleStats(
+    points: Points,
+    epsilon: float,
+    trials: int = 1_000_000,
+    seed: Optional[int] = None,
+    distribution: str = "disc",
+    closed: bool = True,
+    chunk_vertices: int = 2**20,
+) -> WiggleStats:
+    coords = PointArray(points).coords
+    rng = np.random.default_rng(seed)
+    chunk = max(1, chunk_vertices // max(1, len(coords)))
+    convex = 0
+    min_angle, max_angle = np.inf, -np.inf
+    for start in range(0, trials, chunk):
+        count = min(chunk, trials - start)
+        wiggled = np.repeat(coords[np.newaxis], count, axis=0)
+        wiggled[..., :2] += wiggleOffsets(
+            rng, (count, len(coords)), epsilon, distribution
+        )
+        convex += int(np.count_nonzero(isConvex(wiggled, closed)))
+        angles = vertexAngles(wiggled, closed)
+        if angles.size:
+            min_angle = min(min_angle, float(angles.min()))
+            max_angle = max(max_angle, float(angles.max()))
+    return WiggleStats(trials, convex, min_angle, max_angle)